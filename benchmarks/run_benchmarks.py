@@ -0,0 +1,307 @@
+"""Time the app's hot paths against synthetic question banks.
+
+For each bank size a fresh database gets one course ("Bench") of that many
+generated questions. The GUI script is then loaded with tkinter replaced by
+tk_stub, and the real QuizBowlApp methods are timed, with background tasks
+pumped to completion:
+
+    initialize_database     startup on an up-to-date database
+    start_quiz_20 / _all    start_quiz with 20 sampled questions / the whole course
+    adaptive_quiz_20        a whole 20-question adaptive quiz (pick, load, answer)
+    load_questions          load_questions_for_viewing (first page of the browser)
+    submit_question         add question form, including the duplicate check
+    update_question         edit form save, including the list refresh
+    delete_question         delete_selected_question, including the list refresh
+    check_answer            grading GRADE_LIMIT answers with Question.check_answer
+
+Results (median and min milliseconds per size) are written as JSON. With a
+baseline file, any benchmark whose best time is more than --tolerance
+slower (and at least NOISE_MS slower) is flagged and the exit status is 1.
+Timings only compare on the same machine: re-save the baseline there first.
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --sizes 1000,10000,100000,1000000
+    python benchmarks/run_benchmarks.py --save-baseline
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import runpy
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, HERE)
+
+import tk_stub  # noqa: E402
+
+tk_stub.install()
+
+import quiz_db  # noqa: E402
+from question import Question  # noqa: E402
+from quiz_session import AdaptiveQuizSession  # noqa: E402
+
+APP_SCRIPT = os.path.join(ROOT, "quaterly assessment 2.py")
+BASELINE = os.path.join(HERE, "baseline.json")
+RESULTS = os.path.join(HERE, "results.json")
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+COURSE = "Bench"
+REPEAT = 5
+TOLERANCE = 0.5         # run-to-run noise between processes can reach ~40% on small banks
+NOISE_MS = 1.0          # smaller slowdowns than this are never flagged
+GRADE_LIMIT = 100000    # answers graded in check_answer (Question objects are big)
+INSERT_BATCH = 10000
+
+
+def make_bank(size, seed=0):
+    """Fill COURSE with size generated questions.
+
+    Difficulty is left at 0 (uncalibrated): every adaptive pick is then a tie,
+    the slowest case for nearest_question.
+    """
+    rng = random.Random(seed)
+    words = ["alpha", "beta", "gamma", "delta", "ledger", "asset", "empire", "treaty",
+             "variance", "regression", "market", "supply", "revenue", "dynasty"]
+    quiz_db.add_course(COURSE)
+    for start in range(0, size, INSERT_BATCH):
+        rows = []
+        for i in range(start, min(size, start + INSERT_BATCH)):
+            options = [f"{rng.choice(words)} {i}-{n}" for n in range(4)]
+            rows.append((COURSE, f"Question {i}: which {' '.join(rng.sample(words, 4))}?",
+                         *options, options[rng.randrange(4)]))
+        with quiz_db.get_pool().transaction() as conn:
+            quiz_db.add_questions(rows, conn=conn)
+
+
+def measure(fn, repeat, setup=None):
+    """Run fn repeat times (setup untimed before each) and summarize in ms"""
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": statistics.median(times), "min_ms": min(times), "runs": repeat}
+
+
+class AppDriver:
+    """A QuizBowlApp on the Tk stub, with helpers to run its screens to completion"""
+
+    def __init__(self, app_class):
+        self.root = tk_stub.Tk()
+        self.app = app_class(self.root)
+
+    def pump(self):
+        self.root.pump()
+
+    def start_quiz(self, count):
+        self.app.show_quiz_category_selection()
+        self.app.quiz_count_var.set(count)
+        self.app.start_quiz(COURSE)
+        self.pump()
+        assert self.app.screens.current_name == "quiz_question", "quiz did not start"
+
+    def open_question_list(self):
+        self.app.show_view_questions()
+        self.app.view_course_var.set(COURSE)
+
+    def load_questions(self):
+        self.app.load_questions_for_viewing()
+        self.pump()
+
+    def fill_add_form(self):
+        app = self.app
+        app.show_add_question()
+        app.course_var.set(COURSE)
+        app.question_text.insert(tk_stub.END, "Benchmark question?")
+        for n, entry in enumerate((app.option1, app.option2, app.option3, app.option4)):
+            entry.insert(0, f"Choice {n}")
+        app.correct_answer.insert(0, "2")
+
+    def submit_question(self):
+        self.app.submit_question()
+        self.pump()
+
+    def open_first_for_edit(self):
+        self.open_question_list()
+        self.load_questions()
+        first = self.app.questions_tree.get_children()[0]
+        question_id = self.app.questions_tree.item(first)["values"][0]
+        self.app.show_edit_question(COURSE, question_id)
+        self.app.edit_question_text.insert(tk_stub.END, " (edited)")
+        return question_id
+
+    def update_question(self, question_id):
+        self.app.update_question(COURSE, question_id)
+        self.pump()
+
+    def select_first(self):
+        tree = self.app.questions_tree
+        tree.selection_set(tree.get_children()[0])
+
+    def delete_selected(self):
+        self.app.delete_selected_question()
+        self.pump()
+
+
+def take_adaptive_quiz(length=20):
+    """Answer an adaptive quiz to the end, alternating right and wrong"""
+    session = AdaptiveQuizSession.start(COURSE, length)
+    while True:
+        question = session.current_question()
+        if question is None:
+            return session
+        right = session.position % 2 == 0
+        session.submit_answer(question.correct_answer if right else "no such option")
+
+
+def grading_inputs(seed=0):
+    """Question objects and random answers for up to GRADE_LIMIT questions"""
+    rng = random.Random(seed)
+    questions = [Question(row[0], row[1], list(row[2:6]), row[6])
+                 for row in itertools.islice(quiz_db.iter_questions(COURSE), GRADE_LIMIT)]
+    answers = [rng.choice(q.options) for q in questions]
+    return questions, answers
+
+
+def run_size(app_class, size, repeat, workdir):
+    """Build a bank of size questions and time every benchmark on it"""
+    path = os.path.join(workdir, f"bench_{size}.db")
+    quiz_db.set_database(path)
+    quiz_db.initialize_database(seed=False)
+    start = time.perf_counter()
+    make_bank(size)
+    print(f"  generated {size} questions in {time.perf_counter() - start:.1f} s", flush=True)
+
+    results = {}
+    results["initialize_database"] = measure(quiz_db.initialize_database, repeat)
+
+    driver = AppDriver(app_class)
+    results["start_quiz_20"] = measure(lambda: driver.start_quiz("20"), repeat)
+    results["start_quiz_all"] = measure(lambda: driver.start_quiz("All"), repeat)
+    results["adaptive_quiz_20"] = measure(take_adaptive_quiz, repeat)
+
+    driver.open_question_list()
+    results["load_questions"] = measure(driver.load_questions, repeat)
+
+    results["submit_question"] = measure(driver.submit_question, repeat,
+                                         setup=driver.fill_add_form)
+
+    target = []
+    results["update_question"] = measure(
+        lambda: driver.update_question(target[-1]), repeat,
+        setup=lambda: target.append(driver.open_first_for_edit()))
+
+    def before_delete():
+        driver.open_question_list()
+        driver.load_questions()
+        driver.select_first()
+
+    results["delete_question"] = measure(driver.delete_selected, repeat, setup=before_delete)
+
+    questions, answers = grading_inputs()
+    results["check_answer"] = measure(
+        lambda: sum(q.check_answer(a) for q, a in zip(questions, answers)), repeat)
+    results["check_answer"]["answers"] = len(questions)
+
+    driver.app.tasks.shutdown()
+    failures = [m for m in tk_stub.MESSAGES if m[0] == "showerror"]
+    if failures:
+        raise RuntimeError(f"App reported errors during the run: {failures[:3]}")
+    quiz_db.get_pool().close()
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Return (size, name, baseline_ms, current_ms) for every regression"""
+    regressions = []
+    for size, benches in results.items():
+        for name, current in benches.items():
+            previous = baseline.get(size, {}).get(name)
+            if previous is None:
+                continue
+            # Best-of-N is far less sensitive to a busy machine than the median
+            old, new = previous["min_ms"], current["min_ms"]
+            if new > old * (1 + tolerance) and new - old > NOISE_MS:
+                regressions.append((size, name, old, new))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the quiz app on synthetic banks")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated questions per course")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--output", default=RESULTS, help="results JSON file")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline JSON to compare with")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="allowed slowdown before flagging, e.g. 0.5 for 50%%")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store these results as the new baseline")
+    parser.add_argument("--keep-db", action="store_true", help="keep the generated databases")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    app_class = runpy.run_path(APP_SCRIPT, run_name="quiz_app")["QuizBowlApp"]
+    workdir = tempfile.mkdtemp(prefix="quiz_bench_")
+
+    results = {}
+    try:
+        for size in sizes:
+            print(f"{size} questions", flush=True)
+            results[str(size)] = run_size(app_class, size, args.repeat, workdir)
+            for name, summary in results[str(size)].items():
+                print(f"  {name:<20} {summary['median_ms']:10.2f} ms  (min {summary['min_ms']:.2f})")
+    finally:
+        if args.keep_db:
+            print(f"Databases kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "repeat": args.repeat
+        },
+        "results": results
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare with (run with --save-baseline to create one)")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.tolerance)
+    for size, name, old, new in regressions:
+        print(f"REGRESSION {name} at {size} questions: {old:.2f} ms -> {new:.2f} ms "
+              f"({new / old - 1:+.0%})")
+    if not regressions:
+        print(f"No regressions against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""Headless stand-in for tkinter, just enough to drive QuizBowlApp.
+
+install() puts fake tkinter, tkinter.messagebox and tkinter.ttk modules in
+sys.modules, so the GUI script can be loaded on a machine with no display
+and its screens driven by calling the app's methods. Widgets remember the
+options they were given, Entry/Text hold a string, Treeview keeps its rows
+in order, and root.after() callbacks wait in a queue that pump() runs.
+Message boxes never block: they are logged in MESSAGES and askyesno
+returns ASK_YES_NO.
+"""
+import sys
+import time
+import types
+
+END = "end"
+LEFT, RIGHT, TOP, BOTTOM = "left", "right", "top", "bottom"
+BOTH, X, Y = "both", "x", "y"
+N, S, E, W = "n", "s", "e", "w"
+VERTICAL, HORIZONTAL = "vertical", "horizontal"
+
+MESSAGES = []
+ASK_YES_NO = True
+
+_root = None
+
+
+class TclError(Exception):
+    pass
+
+
+class Variable:
+    def __init__(self, master=None, value=None):
+        self._value = value
+
+    def get(self):
+        return self._value
+
+    def set(self, value):
+        # Like Tk, None becomes the string "None"
+        self._value = "None" if value is None else value
+
+
+StringVar = BooleanVar = IntVar = Variable
+
+
+class Widget:
+    def __init__(self, master=None, **options):
+        self.master = master
+        self.options = dict(options)
+        self.children = []
+        self._text = ""
+        if master is not None:
+            master.children.append(self)
+
+    def pack(self, **options):
+        pass
+
+    def grid(self, **options):
+        pass
+
+    def pack_forget(self):
+        pass
+
+    def destroy(self):
+        for child in list(self.children):
+            child.destroy()
+        if self.master is not None and self in self.master.children:
+            self.master.children.remove(self)
+
+    def configure(self, **options):
+        self.options.update(options)
+
+    config = configure
+
+    def cget(self, name):
+        return self.options.get(name)
+
+    def winfo_children(self):
+        return list(self.children)
+
+    def bind(self, *args, **kwargs):
+        pass
+
+    def focus_set(self):
+        pass
+
+    def after(self, ms, fn, *args):
+        _root.pending.append((fn, args))
+
+    def after_idle(self, fn, *args):
+        _root.pending.append((fn, args))
+
+    def yview(self, *args):
+        pass
+
+    def set(self, *args):
+        pass
+
+    def see(self, *args):
+        pass
+
+    # Entry and Text
+    def get(self, *args):
+        return self._text
+
+    def insert(self, index, text):
+        self._text = self._text + text if index == END else text + self._text
+
+    def delete(self, *args):
+        self._text = ""
+
+
+class Tk(Widget):
+    def __init__(self):
+        global _root
+        super().__init__()
+        self.pending = []
+        _root = self
+
+    def title(self, *args):
+        pass
+
+    def geometry(self, *args):
+        pass
+
+    def mainloop(self):
+        pass
+
+    def quit(self):
+        pass
+
+    def pump(self, until=None, timeout=60.0):
+        """Run queued after() callbacks until none are left (or until() is true)"""
+        deadline = time.perf_counter() + timeout
+        while self.pending:
+            if until is not None and until():
+                return
+            if time.perf_counter() > deadline:
+                raise TimeoutError("Tk stub: callbacks still pending")
+            fn, args = self.pending.pop(0)
+            fn(*args)
+            if self.pending:
+                time.sleep(0.0002)
+
+
+class Treeview(Widget):
+    def __init__(self, master=None, **options):
+        super().__init__(master, **options)
+        self._order = []
+        self._values = {}
+        self._selection = ()
+
+    def heading(self, column, **options):
+        pass
+
+    def column(self, column, **options):
+        pass
+
+    def insert(self, parent, index, iid=None, values=()):
+        iid = iid if iid is not None else f"I{len(self._values):06d}"
+        if index == END:
+            self._order.append(iid)
+        else:
+            self._order.insert(index, iid)
+        self._values[iid] = list(values)
+        return iid
+
+    def delete(self, *items):
+        removed = set(items)
+        self._order = [iid for iid in self._order if iid not in removed]
+        for iid in items:
+            self._values.pop(iid, None)
+
+    def get_children(self, item=""):
+        return tuple(self._order)
+
+    def item(self, iid, **options):
+        if options:
+            self._values[iid] = list(options.get("values", self._values[iid]))
+            return None
+        return {"values": self._values[iid]}
+
+    def exists(self, iid):
+        return iid in self._values
+
+    def index(self, iid):
+        return self._order.index(iid)
+
+    def selection(self):
+        return self._selection
+
+    def selection_set(self, items):
+        self._selection = tuple(items) if isinstance(items, (list, tuple)) else (items,)
+
+
+def _widget(name):
+    return type(name, (Widget,), {})
+
+
+Frame = _widget("Frame")
+Label = _widget("Label")
+Button = _widget("Button")
+Entry = _widget("Entry")
+Text = _widget("Text")
+Radiobutton = _widget("Radiobutton")
+Checkbutton = _widget("Checkbutton")
+Scrollbar = _widget("Scrollbar")
+Canvas = _widget("Canvas")
+
+
+def _message(kind):
+    def show(title=None, message=None, **options):
+        MESSAGES.append((kind, title, message))
+        return ASK_YES_NO if kind == "askyesno" else "ok"
+    return show
+
+
+messagebox = types.ModuleType("tkinter.messagebox")
+for _kind in ("showinfo", "showwarning", "showerror", "askyesno"):
+    setattr(messagebox, _kind, _message(_kind))
+
+ttk = types.ModuleType("tkinter.ttk")
+ttk.Treeview = Treeview
+ttk.Combobox = _widget("Combobox")
+ttk.Scrollbar = Scrollbar
+ttk.Frame = Frame
+ttk.Label = Label
+ttk.Button = Button
+ttk.Progressbar = _widget("Progressbar")
+
+
+def install():
+    """Replace tkinter in sys.modules with this stub"""
+    module = sys.modules[__name__]
+    module.messagebox = messagebox
+    module.ttk = ttk
+    sys.modules["tkinter"] = module
+    sys.modules["tkinter.messagebox"] = messagebox
+    sys.modules["tkinter.ttk"] = ttk
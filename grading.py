@@ -0,0 +1,90 @@
+"""Offline batch grading of whole answer sheets with NumPy.
+
+Responses and answer keys are option indices: 0-3 for the four options and
+-1 (UNANSWERED) for a blank. A cohort is a (takers x items) int8 matrix, so
+grading every taker is a single vectorized comparison against the key.
+
+    python grading.py 5000 200
+
+grades a random cohort of that size and prints the throughput.
+"""
+import sys
+import time
+
+import numpy as np
+
+import quiz_db
+
+UNANSWERED = -1
+
+
+class GradeReport:
+    """Result of grading a response matrix against an answer key"""
+
+    def __init__(self, correct):
+        self.correct = correct                          # bool, takers x items
+        self.scores = correct.sum(axis=1, dtype=np.int32)
+        self.item_correct = correct.sum(axis=0, dtype=np.int32)
+
+    @property
+    def item_count(self):
+        return self.correct.shape[1]
+
+    @property
+    def percentages(self):
+        """Per-taker score as a percentage of the items"""
+        return self.scores * (100.0 / max(self.item_count, 1))
+
+    @property
+    def item_pvalues(self):
+        """Share of takers who got each item right"""
+        return self.item_correct / max(self.correct.shape[0], 1)
+
+
+def key_for_questions(question_ids):
+    """Build an answer key from the question store"""
+    return np.asarray(quiz_db.get_answer_key(question_ids), dtype=np.int8)
+
+
+def key_for_bank(bank):
+    """Answer key of a QuestionBank, shared with the bank without copying"""
+    return np.frombuffer(bank.correct_indices(), dtype=np.int8)
+
+
+def encode_responses(answers, options):
+    """Turn chosen option texts into indices; unknown or missing answers become UNANSWERED"""
+    return np.array([options[i].index(answer) if answer in options[i] else UNANSWERED
+                     for i, answer in enumerate(answers)], dtype=np.int8)
+
+
+def grade(responses, key):
+    """Grade a (takers x items) response matrix against a length-items key"""
+    responses = np.asarray(responses, dtype=np.int8)
+    key = np.asarray(key, dtype=np.int8)
+    if responses.ndim == 1:
+        responses = responses[np.newaxis, :]
+    if responses.shape[1] != key.shape[0]:
+        raise ValueError(f"Responses have {responses.shape[1]} items but the key has {key.shape[0]}")
+
+    # A key entry of -1 (no valid answer) must never match a blank response
+    return GradeReport((responses == key) & (key != UNANSWERED))
+
+
+def benchmark(takers, items, repeat=5):
+    """Return graded responses per second for a random cohort"""
+    rng = np.random.default_rng(0)
+    key = rng.integers(0, 4, size=items, dtype=np.int8)
+    responses = rng.integers(-1, 4, size=(takers, items), dtype=np.int8)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        grade(responses, key)
+        best = min(best, time.perf_counter() - start)
+    return takers * items / best
+
+
+if __name__ == "__main__":
+    takers = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    items = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rate = benchmark(takers, items)
+    print(f"{takers} takers x {items} items: {rate / 1e6:.1f} million responses/second")
@@ -0,0 +1,45 @@
+"""Build-once screen cache for the Tk app.
+
+Each screen is a Frame whose widgets are created by its build function the
+first time it is shown. After that, switching screens only swaps which
+frame is packed, and the app rebinds the widgets' text and values instead
+of destroying and recreating them, so the widget count stays flat however
+long the app runs.
+"""
+
+class ScreenController:
+    """Caches one Frame per screen and shows one at a time"""
+
+    def __init__(self, root):
+        self.root = root
+        self.frames = {}
+        self.current = None
+        self.current_name = None
+
+    def show(self, name, build):
+        """Show the named screen, calling build(frame) only on first use"""
+        import tkinter as tk
+
+        frame = self.frames.get(name)
+        if frame is None:
+            frame = tk.Frame(self.root)
+            build(frame)
+            self.frames[name] = frame
+
+        if frame is not self.current:
+            if self.current is not None:
+                self.current.pack_forget()
+            frame.pack(fill=tk.BOTH, expand=True)
+            self.current = frame
+            self.current_name = name
+        return frame
+
+    def widget_count(self):
+        """Number of live widgets under the root, for checking reuse"""
+        count = 0
+        pending = list(self.root.winfo_children())
+        while pending:
+            widget = pending.pop()
+            count += 1
+            pending.extend(widget.winfo_children())
+        return count
@@ -0,0 +1,81 @@
+"""Run database work off the Tk main loop.
+
+BackgroundRunner sends blocking calls to a thread pool and delivers their
+results on the Tk thread from a root.after poll, so callbacks may touch
+widgets freely. Every task is tagged with the screen generation current
+when it was submitted; new_screen() moves to a new generation and any
+result from an older one is dropped instead of being drawn over the
+screen that replaced it.
+"""
+import quiz_db
+
+POLL_MS = 15
+
+
+class BackgroundRunner:
+    """Thread pool whose results come back through root.after"""
+
+    def __init__(self, root, workers=quiz_db.POOL_SIZE, poll_ms=POLL_MS):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.generation = 0
+        self.workers = workers
+        self._executor = None
+        self._pending = []
+        self._polling = False
+
+    def submit(self, fn, *args, on_done=None, on_error=None):
+        """Run fn(*args) on a worker; on_done(result) or on_error(exc) runs on the Tk thread"""
+        if self._executor is None:
+            # Started on first use; importing concurrent.futures is a noticeable part of startup
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                thread_name_prefix="quiz-gui")
+        future = self._executor.submit(fn, *args)
+        self._pending.append((future, on_done, on_error, self.generation))
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+        return future
+
+    def new_screen(self):
+        """Start a new generation, cancelling or orphaning all earlier tasks"""
+        self.generation += 1
+        for future, *_ in self._pending:
+            future.cancel()
+        return self.generation
+
+    @property
+    def busy(self):
+        """True while a task of the current generation is unfinished"""
+        return any(generation == self.generation and not future.done()
+                   for future, _, _, generation in self._pending)
+
+    def _poll(self):
+        finished, pending = [], []
+        for task in self._pending:
+            (finished if task[0].done() else pending).append(task)
+        self._pending = pending
+
+        try:
+            for future, on_done, on_error, generation in finished:
+                # Checked per task: a callback may itself move to a new screen
+                if generation != self.generation or future.cancelled():
+                    continue
+                error = future.exception()
+                if error is not None:
+                    if on_error:
+                        on_error(error)
+                elif on_done:
+                    on_done(future.result())
+        finally:
+            # Keep polling even if a callback raised
+            if self._pending:
+                self.root.after(self.poll_ms, self._poll)
+            else:
+                self._polling = False
+
+    def shutdown(self):
+        self.new_screen()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
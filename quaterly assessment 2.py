@@ -1,69 +1,13 @@
-import sqlite3
-
-def initialize_database():
-    conn = sqlite3.connect('quiz_bowl.db')
-    cursor = conn.cursor()
-    
-    # Create tables for 5 course categories
-    courses = [
-        "BMGT",
-        "DS3850",
-        "DS3860",
-        "Accounting",
-        "History"
-    ]
-    
-    for course in courses:
-        cursor.execute(f'''
-        CREATE TABLE IF NOT EXISTS {course} (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            question_text TEXT NOT NULL,
-            option1 TEXT NOT NULL,
-            option2 TEXT NOT NULL,
-            option3 TEXT NOT NULL,
-            option4 TEXT NOT NULL,
-            correct_answer TEXT NOT NULL
-        )
-        ''')
-    
-    # Insert sample questions if tables are empty
-    for course in courses:
-        cursor.execute(f"SELECT COUNT(*) FROM {course}")
-        if cursor.fetchone()[0] == 0:
-            # Add sample questions (10 per course)
-            for i in range(1, 11):
-                cursor.execute(f'''
-                INSERT INTO {course} (question_text, option1, option2, option3, option4, correct_answer)
-                VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
-                    f"Sample question {i} for {course}",
-                    "Option A",
-                    "Option B",
-                    "Option C",
-                    "Option D",
-                    "Option B"  # Sample correct answer
-                ))
-    
-    conn.commit()
-    conn.close()
-
-class Question:
-    def __init__(self, question_id, question_text, options, correct_answer):
-        self.question_id = question_id
-        self.question_text = question_text
-        self.options = options
-        self.correct_answer = correct_answer
-    
-    def check_answer(self, user_answer):
-        return user_answer == self.correct_answer
-    
-    def display_question(self):
-        return {
-            "id": self.question_id,
-            "text": self.question_text,
-            "options": self.options,
-            "correct_answer": self.correct_answer
-        }
+import quiz_db
+from gui_screens import ScreenController
+from gui_tasks import BackgroundRunner
+from question_browser import QuestionBrowser
+from quiz_attempts import AttemptLog, course_report, item_report
+from quiz_cache import CourseCache
+import quiz_dedup
+import quiz_pack
+from quiz_session import AdaptiveQuizSession, QuizSession
+import quiz_trace
 
 import tkinter as tk
 from tkinter import messagebox, ttk
@@ -75,46 +19,108 @@ class QuizBowlApp:
         self.root.geometry("800x600")
         
         # Initialize database
-        initialize_database()
+        quiz_db.initialize_database()
         
         # Admin credentials
         self.admin_password = "admin123"
         
+        # Database work runs here so the window never freezes
+        self.tasks = BackgroundRunner(self.root)
+        
+        # Quiz answers are saved in batches by a worker, not per click
+        self.attempt_log = AttemptLog()
+        
+        # Recently used courses stay in memory; edits below go through it
+        self.question_cache = CourseCache()
+        quiz_trace.register_counters("question_cache", self.question_cache.stats)
+        
+        # QUIZ_PACK names a compiled question pack that quizzes are taken from
+        self.question_pack = quiz_pack.open_from_env()
+        
+        # Every screen is built once and then only rebound to new data
+        self.screens = ScreenController(self.root)
+        self.loading_frame = None
+        self.loading_on_cancel = None
+        
         # Create main menu
         self.show_main_menu()
     
     def show_main_menu(self):
         """Display the main menu with admin and quiz taker options"""
-        self.clear_window()
-        
-        tk.Label(self.root, text="Welcome to Quiz Bowl", font=("Arial", 20)).pack(pady=20)
+        self.show_screen("main_menu", self.build_main_menu)
+    
+    def build_main_menu(self, frame):
+        """Create the main menu widgets"""
+        tk.Label(frame, text="Welcome to Quiz Bowl", font=("Arial", 20)).pack(pady=20)
         
-        tk.Button(self.root, text="Administrator Login", 
+        tk.Button(frame, text="Administrator Login", 
                  command=self.show_admin_login, width=20).pack(pady=10)
-        tk.Button(self.root, text="Take a Quiz", 
+        tk.Button(frame, text="Take a Quiz", 
                  command=self.show_quiz_category_selection, width=20).pack(pady=10)
-        tk.Button(self.root, text="Exit", 
+        tk.Button(frame, text="Exit", 
                  command=self.root.quit, width=20).pack(pady=10)
     
-    def clear_window(self):
-        """Clear all widgets from the window"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+    def show_screen(self, name, build):
+        """Switch to a cached screen, building its widgets the first time"""
+        # Results still on their way belong to the old screen
+        self.tasks.new_screen()
+        self.hide_loading()
+        return self.screens.show(name, build)
+    
+    def show_loading(self, message, on_cancel=None, cancellable=True):
+        """Show a loading message, with a Cancel button, while a task runs"""
+        if self.loading_frame is None:
+            self.loading_frame = tk.Frame(self.root)
+            self.loading_label = tk.Label(self.loading_frame, font=("Arial", 12))
+            self.loading_label.pack(side=tk.LEFT, padx=10)
+            self.loading_cancel = tk.Button(self.loading_frame, text="Cancel",
+                                            command=self.cancel_loading)
+        
+        self.loading_label.config(text=message)
+        self.loading_on_cancel = on_cancel
+        if cancellable:
+            self.loading_cancel.pack(side=tk.LEFT)
+        else:
+            self.loading_cancel.pack_forget()
+        self.loading_frame.pack(side=tk.BOTTOM, pady=10, before=self.screens.current)
+    
+    def hide_loading(self):
+        """Remove the loading message"""
+        if self.loading_frame is not None:
+            self.loading_frame.pack_forget()
+        self.loading_on_cancel = None
+    
+    def cancel_loading(self):
+        """Drop the running task's result and stay on the current screen"""
+        on_cancel = self.loading_on_cancel
+        self.tasks.new_screen()
+        self.hide_loading()
+        if on_cancel:
+            on_cancel()
+    
+    def task_failed(self, message, error):
+        """Report a failed background task"""
+        self.hide_loading()
+        messagebox.showerror("Error", f"{message}: {str(error)}")
     
     # ... (other methods will be implemented below)
-
+    
     def show_admin_login(self):
         """Display admin login screen"""
-        self.clear_window()
-        
-        tk.Label(self.root, text="Administrator Login", font=("Arial", 16)).pack(pady=20)
+        self.show_screen("admin_login", self.build_admin_login)
+        self.password_entry.delete(0, tk.END)
+        self.password_entry.focus_set()
+    
+    def build_admin_login(self, frame):
+        """Create the admin login widgets"""
+        tk.Label(frame, text="Administrator Login", font=("Arial", 16)).pack(pady=20)
         
-        tk.Label(self.root, text="Password:").pack()
-        self.password_entry = tk.Entry(self.root, show="*")
+        tk.Label(frame, text="Password:").pack()
+        self.password_entry = tk.Entry(frame, show="*")
         self.password_entry.pack(pady=5)
         
-        tk.Button(self.root, text="Login", command=self.verify_admin).pack(pady=10)
-        tk.Button(self.root, text="Back", command=self.show_main_menu).pack(pady=5)
+        tk.Button(frame, text="Login", command=self.verify_admin).pack(pady=10)
+        tk.Button(frame, text="Back", command=self.show_main_menu).pack(pady=5)
     
     def verify_admin(self):
         """Verify admin password"""
@@ -125,126 +131,230 @@ class QuizBowlApp:
     
     def show_admin_dashboard(self):
         """Display admin dashboard with options"""
-        self.clear_window()
-        
-        tk.Label(self.root, text="Administrator Dashboard", font=("Arial", 16)).pack(pady=20)
+        self.show_screen("admin_dashboard", self.build_admin_dashboard)
+    
+    def build_admin_dashboard(self, frame):
+        """Create the admin dashboard widgets"""
+        tk.Label(frame, text="Administrator Dashboard", font=("Arial", 16)).pack(pady=20)
         
-        tk.Button(self.root, text="Add Questions", 
+        tk.Button(frame, text="Add Questions", 
                  command=self.show_add_question, width=20).pack(pady=10)
-        tk.Button(self.root, text="View/Edit Questions", 
+        tk.Button(frame, text="View/Edit Questions", 
                  command=self.show_view_questions, width=20).pack(pady=10)
-        tk.Button(self.root, text="Back to Main Menu", 
+        tk.Button(frame, text="Quiz Statistics", 
+                 command=self.show_statistics, width=20).pack(pady=10)
+        tk.Button(frame, text="Back to Main Menu", 
                  command=self.show_main_menu, width=20).pack(pady=10)
     
     def show_add_question(self):
         """Display form to add new questions"""
-        self.clear_window()
-        
-        tk.Label(self.root, text="Add New Question", font=("Arial", 16)).pack(pady=20)
+        self.show_screen("add_question", self.build_add_question)
+        self.course_menu.config(values=self.question_cache.list_courses())
+        self.reset_add_form()
+    
+    def build_add_question(self, frame):
+        """Create the add question form"""
+        tk.Label(frame, text="Add New Question", font=("Arial", 16)).pack(pady=20)
         
-        # Course selection
-        tk.Label(self.root, text="Select Course:").pack()
+        # Course selection; a new course can be typed in and added
+        tk.Label(frame, text="Select Course:").pack()
         self.course_var = tk.StringVar()
-        courses = ["Computer_Science", "Mathematics", "Physics", "Literature", "History"]
-        course_menu = ttk.Combobox(self.root, textvariable=self.course_var, values=courses)
-        course_menu.pack(pady=5)
+        self.course_menu = ttk.Combobox(frame, textvariable=self.course_var)
+        self.course_menu.pack(pady=5)
+        tk.Button(frame, text="Add as New Course", 
+                 command=self.add_course).pack(pady=2)
         
         # Question text
-        tk.Label(self.root, text="Question Text:").pack()
-        self.question_text = tk.Text(self.root, height=4, width=50)
+        tk.Label(frame, text="Question Text:").pack()
+        self.question_text = tk.Text(frame, height=4, width=50)
         self.question_text.pack(pady=5)
         
         # Options
-        tk.Label(self.root, text="Options:").pack()
+        tk.Label(frame, text="Options:").pack()
         
-        tk.Label(self.root, text="Option 1:").pack()
-        self.option1 = tk.Entry(self.root, width=50)
+        tk.Label(frame, text="Option 1:").pack()
+        self.option1 = tk.Entry(frame, width=50)
         self.option1.pack(pady=2)
         
-        tk.Label(self.root, text="Option 2:").pack()
-        self.option2 = tk.Entry(self.root, width=50)
+        tk.Label(frame, text="Option 2:").pack()
+        self.option2 = tk.Entry(frame, width=50)
         self.option2.pack(pady=2)
         
-        tk.Label(self.root, text="Option 3:").pack()
-        self.option3 = tk.Entry(self.root, width=50)
+        tk.Label(frame, text="Option 3:").pack()
+        self.option3 = tk.Entry(frame, width=50)
         self.option3.pack(pady=2)
         
-        tk.Label(self.root, text="Option 4:").pack()
-        self.option4 = tk.Entry(self.root, width=50)
+        tk.Label(frame, text="Option 4:").pack()
+        self.option4 = tk.Entry(frame, width=50)
         self.option4.pack(pady=2)
         
         # Correct answer
-        tk.Label(self.root, text="Correct Answer (1-4):").pack()
-        self.correct_answer = tk.Entry(self.root, width=5)
+        tk.Label(frame, text="Correct Answer (1-4):").pack()
+        self.correct_answer = tk.Entry(frame, width=5)
         self.correct_answer.pack(pady=5)
         
         # Buttons
-        tk.Button(self.root, text="Submit", command=self.submit_question).pack(pady=10)
-        tk.Button(self.root, text="Back", command=self.show_admin_dashboard).pack(pady=5)
+        tk.Button(frame, text="Submit", command=self.submit_question).pack(pady=10)
+        tk.Button(frame, text="Back", command=self.show_admin_dashboard).pack(pady=5)
+    
+    def add_course(self):
+        """Register the course name typed into the add form"""
+        course = self.course_var.get().strip()
+        if not course:
+            messagebox.showerror("Error", "Please type the name of the new course")
+            return
+        if course in self.question_cache.list_courses():
+            messagebox.showerror("Error", f"Course {course} already exists")
+            return
+        
+        self.show_loading("Saving...", cancellable=False)
+        self.tasks.submit(self.question_cache.add_course, course,
+                          on_done=lambda _: self.course_added(course),
+                          on_error=lambda e: self.task_failed("Failed to add course", e))
+    
+    def course_added(self, course):
+        """Offer the new course in the add form"""
+        self.hide_loading()
+        self.course_menu.config(values=self.question_cache.list_courses())
+        self.course_var.set(course)
+        messagebox.showinfo("Success", f"Course {course} added successfully!")
+    
+    def reset_add_form(self):
+        """Empty the add question form, keeping the chosen course"""
+        self.question_text.delete("1.0", tk.END)
+        for entry in (self.option1, self.option2, self.option3, self.option4,
+                      self.correct_answer):
+            entry.delete(0, tk.END)
     
     def submit_question(self):
         """Submit new question to database"""
         try:
             course = self.course_var.get()
-            question_text = self.question_text.get("1.0", tk.END).strip()
-            options = [
-                self.option1.get().strip(),
-                self.option2.get().strip(),
-                self.option3.get().strip(),
-                self.option4.get().strip()
-            ]
-            correct_idx = int(self.correct_answer.get().strip()) - 1
-            
-            if not all(options) or correct_idx not in range(4):
-                raise ValueError("Invalid options or correct answer")
-            
-            conn = sqlite3.connect('quiz_bowl.db')
-            cursor = conn.cursor()
-            
-            cursor.execute(f'''
-            INSERT INTO {course} (question_text, option1, option2, option3, option4, correct_answer)
-            VALUES (?, ?, ?, ?, ?, ?)
-            ''', (question_text, *options, options[correct_idx]))
-            
-            conn.commit()
-            conn.close()
-            
-            messagebox.showinfo("Success", "Question added successfully!")
-            self.show_add_question()  # Clear form
-            
+            question_text, options, correct_answer = quiz_db.validate_question(
+                self.question_text.get("1.0", tk.END),
+                [
+                    self.option1.get(),
+                    self.option2.get(),
+                    self.option3.get(),
+                    self.option4.get()
+                ],
+                self.correct_answer.get())
+        
         except Exception as e:
             messagebox.showerror("Error", f"Failed to add question: {str(e)}")
+            return
+        
+        # Look for a reworded copy already in the course before adding it
+        def check_duplicates():
+            bands = quiz_dedup.band_keys(question_text, options)
+            return bands, quiz_dedup.find_duplicates(course, question_text, options, keys=bands)
+        
+        self.show_loading("Saving...", cancellable=False)
+        self.tasks.submit(check_duplicates,
+                          on_done=lambda result: self.confirm_new_question(
+                              course, question_text, options, correct_answer, *result),
+                          on_error=lambda e: self.task_failed("Failed to add question", e))
+    
+    def confirm_new_question(self, course, question_text, options, correct_answer, bands,
+                             duplicates):
+        """Ask before adding a likely duplicate, then add the question"""
+        if duplicates:
+            similarity, duplicate_id, duplicate_text = duplicates[0]
+            if not messagebox.askyesno(
+                    "Possible Duplicate",
+                    f"This looks like question {duplicate_id} ({similarity:.0%} similar):\n\n"
+                    f"{duplicate_text}\n\nAdd it anyway?"):
+                self.hide_loading()
+                return
+        
+        self.tasks.submit(lambda: self.question_cache.add_question(
+                              course, question_text, options, correct_answer, bands=bands),
+                          on_done=self.question_added,
+                          on_error=lambda e: self.task_failed("Failed to add question", e))
+    
+    def question_added(self, _):
+        """Clear the add form once a question is saved"""
+        self.hide_loading()
+        messagebox.showinfo("Success", "Question added successfully!")
+        self.reset_add_form()
     
     def show_view_questions(self):
         """Display interface to view and edit questions"""
-        self.clear_window()
+        self.show_screen("view_questions", self.build_view_questions)
+        courses = self.question_cache.list_courses()
+        self.view_course_menu.config(values=courses)
+        self.move_course_menu.config(values=courses)
         
-        tk.Label(self.root, text="View/Edit Questions", font=("Arial", 16)).pack(pady=20)
+        # Coming back from an edit: reload so the change shows
+        self.refresh_question_list()
+    
+    def build_view_questions(self, frame):
+        """Create the question list and its buttons"""
+        tk.Label(frame, text="View/Edit Questions", font=("Arial", 16)).pack(pady=20)
         
         # Course selection
-        tk.Label(self.root, text="Select Course:").pack()
+        tk.Label(frame, text="Select Course:").pack()
         self.view_course_var = tk.StringVar()
-        courses = ["BMGT", "DS3850", "DS3860", "Accounting", "History"]
-        course_menu = ttk.Combobox(self.root, textvariable=self.view_course_var, values=courses)
-        course_menu.pack(pady=5)
+        self.view_course_menu = ttk.Combobox(frame, textvariable=self.view_course_var)
+        self.view_course_menu.pack(pady=5)
         
         # Button to load questions
-        tk.Button(self.root, text="Load Questions", 
+        tk.Button(frame, text="Load Questions", 
                  command=self.load_questions_for_viewing).pack(pady=10)
         
-        # Treeview for displaying questions
-        self.questions_tree = ttk.Treeview(self.root, columns=("ID", "Question", "Correct Answer"), show="headings")
+        # Search across all courses (question text and options)
+        search_frame = tk.Frame(frame)
+        search_frame.pack(pady=5)
+        tk.Label(search_frame, text="Search:").pack(side=tk.LEFT)
+        self.search_entry = tk.Entry(search_frame, width=40)
+        self.search_entry.pack(side=tk.LEFT, padx=5)
+        self.search_entry.bind("<Return>", lambda event: self.search_questions())
+        tk.Button(search_frame, text="Search", 
+                 command=self.search_questions).pack(side=tk.LEFT)
+        tk.Button(search_frame, text="Find Duplicates",
+                 command=self.find_duplicates).pack(side=tk.LEFT, padx=5)
+        self.last_search = None
+        self.last_duplicates = None
+        
+        # Treeview for displaying questions; pages are fetched as it scrolls
+        tree_frame = tk.Frame(frame)
+        tree_frame.pack(pady=10, fill=tk.BOTH, expand=True)
+        self.questions_tree = ttk.Treeview(tree_frame, columns=("ID", "Question", "Correct Answer"), show="headings")
         self.questions_tree.heading("ID", text="ID")
         self.questions_tree.heading("Question", text="Question")
         self.questions_tree.heading("Correct Answer", text="Correct Answer")
-        self.questions_tree.pack(pady=10, fill=tk.BOTH, expand=True)
+        tree_scroll = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL)
+        tree_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.questions_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.question_browser = QuestionBrowser(
+            self.questions_tree, tree_scroll, run=self.tasks.submit,
+            on_error=lambda e: self.task_failed("Failed to load questions", e),
+            fetch=self.question_cache.fetch_question_page)
+        
+        # Bulk changes to every selected row (Shift/Ctrl-click to select many)
+        bulk_frame = tk.Frame(frame)
+        bulk_frame.pack(pady=5)
+        tk.Label(bulk_frame, text="Move to:").pack(side=tk.LEFT)
+        self.move_course_var = tk.StringVar()
+        self.move_course_menu = ttk.Combobox(bulk_frame, textvariable=self.move_course_var, width=15)
+        self.move_course_menu.pack(side=tk.LEFT, padx=5)
+        tk.Button(bulk_frame, text="Move Selected", 
+                 command=self.move_selected_questions).pack(side=tk.LEFT, padx=5)
+        tk.Label(bulk_frame, text="Find:").pack(side=tk.LEFT, padx=(15, 0))
+        self.find_entry = tk.Entry(bulk_frame, width=15)
+        self.find_entry.pack(side=tk.LEFT, padx=5)
+        tk.Label(bulk_frame, text="Replace with:").pack(side=tk.LEFT)
+        self.replace_entry = tk.Entry(bulk_frame, width=15)
+        self.replace_entry.pack(side=tk.LEFT, padx=5)
+        tk.Button(bulk_frame, text="Replace in Options", 
+                 command=self.replace_in_selected_options).pack(side=tk.LEFT, padx=5)
         
         # Buttons for edit/delete
-        tk.Button(self.root, text="Edit Selected", 
+        tk.Button(frame, text="Edit Selected", 
                  command=self.edit_selected_question).pack(side=tk.LEFT, padx=20, pady=10)
-        tk.Button(self.root, text="Delete Selected", 
+        tk.Button(frame, text="Delete Selected", 
                  command=self.delete_selected_question).pack(side=tk.RIGHT, padx=20, pady=10)
-        tk.Button(self.root, text="Back", 
+        tk.Button(frame, text="Back", 
                  command=self.show_admin_dashboard).pack(pady=10)
     
     def load_questions_for_viewing(self):
@@ -254,25 +364,85 @@ class QuizBowlApp:
             messagebox.showerror("Error", "Please select a course")
             return
         
-        try:
-            conn = sqlite3.connect('quiz_bowl.db')
-            cursor = conn.cursor()
-            
-            cursor.execute(f"SELECT id, question_text, correct_answer FROM {course}")
-            questions = cursor.fetchall()
-            
-            # Clear existing items
-            for item in self.questions_tree.get_children():
-                self.questions_tree.delete(item)
-            
-            # Add new items
-            for q in questions:
-                self.questions_tree.insert("", tk.END, values=q)
-            
-            conn.close()
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load questions: {str(e)}")
+        self.last_search = None
+        self.last_duplicates = None
+        self.show_loading("Loading questions...", on_cancel=self.question_browser.cancel)
+        self.question_browser.load(course, on_done=self.hide_loading)
+    
+    def search_questions(self):
+        """Search every course for questions matching the search box"""
+        text = self.search_entry.get().strip()
+        if not text:
+            messagebox.showerror("Error", "Please enter something to search for")
+            return
+        
+        self.last_search = text
+        self.last_duplicates = None
+        self.show_loading("Searching...")
+        self.tasks.submit(quiz_db.search_questions, text,
+                          on_done=self.show_search_results,
+                          on_error=lambda e: self.task_failed("Search failed", e))
+    
+    def show_search_results(self, rows):
+        """List search results in the question tree"""
+        self.hide_loading()
+        self.question_browser.show_results(rows)
+        if not rows:
+            messagebox.showinfo("Search", "No matching questions found")
+    
+    def find_duplicates(self):
+        """List groups of near-duplicate questions in the selected course"""
+        course = self.view_course_var.get()
+        if not course:
+            messagebox.showerror("Error", "Please select a course")
+            return
+        
+        self.last_search = None
+        self.last_duplicates = course
+        self.show_loading("Looking for duplicates...")
+        self.tasks.submit(quiz_dedup.duplicate_report, course,
+                          on_done=lambda groups: self.show_duplicates(course, groups),
+                          on_error=lambda e: self.task_failed("Duplicate check failed", e))
+    
+    def show_duplicates(self, course, groups):
+        """List duplicate groups in the question tree, numbered by group"""
+        self.hide_loading()
+        self.question_browser.show_results([
+            (question_id, course, f"({number}) {question_text}", correct_answer)
+            for number, group in enumerate(groups, start=1)
+            for question_id, question_text, correct_answer in group])
+        if not groups:
+            messagebox.showinfo("Duplicates", "No likely duplicates found")
+    
+    def refresh_question_list(self):
+        """Reload whatever the question tree is showing (a course or a search)"""
+        if self.last_search:
+            self.search_entry.delete(0, tk.END)
+            self.search_entry.insert(0, self.last_search)
+            self.search_questions()
+        elif self.last_duplicates:
+            self.view_course_var.set(self.last_duplicates)
+            self.find_duplicates()
+        elif self.question_browser.course is not None:
+            self.show_loading("Loading questions...", on_cancel=self.question_browser.cancel)
+            self.question_browser.refresh(on_done=self.hide_loading)
+    
+    def selected_questions(self):
+        """(course, question_id) pairs of the selected rows, or None after an error message"""
+        selected = self.questions_tree.selection()
+        if not selected:
+            messagebox.showerror("Error", "Please select a question")
+            return None
+        
+        items = []
+        for iid in selected:
+            course = self.question_browser.course_of(iid)
+            if not course:
+                messagebox.showerror("Error", "Please select a course")
+                return None
+            # Rows are inserted with the question id as their iid
+            items.append((course, int(iid)))
+        return items
     
     def edit_selected_question(self):
         """Edit selected question"""
@@ -280,8 +450,11 @@ class QuizBowlApp:
         if not selected:
             messagebox.showerror("Error", "Please select a question")
             return
+        if len(selected) > 1:
+            messagebox.showerror("Error", "Please select only one question to edit")
+            return
         
-        course = self.view_course_var.get()
+        course = self.question_browser.course_of(selected[0])
         if not course:
             messagebox.showerror("Error", "Please select a course")
             return
@@ -294,261 +467,435 @@ class QuizBowlApp:
     
     def show_edit_question(self, course, question_id):
         """Display form to edit existing question"""
-        self.clear_window()
-        
-        tk.Label(self.root, text="Edit Question", font=("Arial", 16)).pack(pady=20)
-        
         try:
-            conn = sqlite3.connect('quiz_bowl.db')
-            cursor = conn.cursor()
-            
-            cursor.execute(f'''
-            SELECT question_text, option1, option2, option3, option4, correct_answer 
-            FROM {course} WHERE id = ?
-            ''', (question_id,))
-            
-            question_data = cursor.fetchone()
-            conn.close()
+            question_data = self.question_cache.get_question(course, question_id)
             
             if not question_data:
                 raise ValueError("Question not found")
             
-            # Course display (read-only)
-            tk.Label(self.root, text=f"Course: {course}").pack()
-            
-            # Question text
-            tk.Label(self.root, text="Question Text:").pack()
-            self.edit_question_text = tk.Text(self.root, height=4, width=50)
-            self.edit_question_text.insert(tk.END, question_data[0])
-            self.edit_question_text.pack(pady=5)
-            
-            # Options
-            tk.Label(self.root, text="Options:").pack()
-            
-            tk.Label(self.root, text="Option 1:").pack()
-            self.edit_option1 = tk.Entry(self.root, width=50)
-            self.edit_option1.insert(0, question_data[1])
-            self.edit_option1.pack(pady=2)
-            
-            tk.Label(self.root, text="Option 2:").pack()
-            self.edit_option2 = tk.Entry(self.root, width=50)
-            self.edit_option2.insert(0, question_data[2])
-            self.edit_option2.pack(pady=2)
-            
-            tk.Label(self.root, text="Option 3:").pack()
-            self.edit_option3 = tk.Entry(self.root, width=50)
-            self.edit_option3.insert(0, question_data[3])
-            self.edit_option3.pack(pady=2)
-            
-            tk.Label(self.root, text="Option 4:").pack()
-            self.edit_option4 = tk.Entry(self.root, width=50)
-            self.edit_option4.insert(0, question_data[4])
-            self.edit_option4.pack(pady=2)
-            
             # Correct answer
             correct_answer = question_data[5]
             correct_idx = question_data[1:5].index(correct_answer) + 1
-            
-            tk.Label(self.root, text="Correct Answer (1-4):").pack()
-            self.edit_correct_answer = tk.Entry(self.root, width=5)
-            self.edit_correct_answer.insert(0, str(correct_idx))
-            self.edit_correct_answer.pack(pady=5)
-            
-            # Buttons
-            tk.Button(self.root, text="Update", 
-                     command=lambda: self.update_question(course, question_id)).pack(pady=10)
-            tk.Button(self.root, text="Cancel", 
-                     command=self.show_view_questions).pack(pady=5)
-            
+        
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load question: {str(e)}")
             self.show_view_questions()
+            return
+        
+        self.show_screen("edit_question", self.build_edit_question)
+        self.edit_target = (course, question_id)
+        
+        # Course display (read-only)
+        self.edit_course_label.config(text=f"Course: {course}")
+        
+        self.edit_question_text.delete("1.0", tk.END)
+        self.edit_question_text.insert(tk.END, question_data[0])
+        
+        fields = (self.edit_option1, self.edit_option2, self.edit_option3, self.edit_option4,
+                  self.edit_correct_answer)
+        for entry, value in zip(fields, (*question_data[1:5], str(correct_idx))):
+            entry.delete(0, tk.END)
+            entry.insert(0, value)
+    
+    def build_edit_question(self, frame):
+        """Create the edit question form"""
+        tk.Label(frame, text="Edit Question", font=("Arial", 16)).pack(pady=20)
+        
+        self.edit_course_label = tk.Label(frame)
+        self.edit_course_label.pack()
+        
+        # Question text
+        tk.Label(frame, text="Question Text:").pack()
+        self.edit_question_text = tk.Text(frame, height=4, width=50)
+        self.edit_question_text.pack(pady=5)
+        
+        # Options
+        tk.Label(frame, text="Options:").pack()
+        
+        tk.Label(frame, text="Option 1:").pack()
+        self.edit_option1 = tk.Entry(frame, width=50)
+        self.edit_option1.pack(pady=2)
+        
+        tk.Label(frame, text="Option 2:").pack()
+        self.edit_option2 = tk.Entry(frame, width=50)
+        self.edit_option2.pack(pady=2)
+        
+        tk.Label(frame, text="Option 3:").pack()
+        self.edit_option3 = tk.Entry(frame, width=50)
+        self.edit_option3.pack(pady=2)
+        
+        tk.Label(frame, text="Option 4:").pack()
+        self.edit_option4 = tk.Entry(frame, width=50)
+        self.edit_option4.pack(pady=2)
+        
+        tk.Label(frame, text="Correct Answer (1-4):").pack()
+        self.edit_correct_answer = tk.Entry(frame, width=5)
+        self.edit_correct_answer.pack(pady=5)
+        
+        # Buttons
+        tk.Button(frame, text="Update",
+                 command=lambda: self.update_question(*self.edit_target)).pack(pady=10)
+        tk.Button(frame, text="Cancel",
+                 command=self.show_view_questions).pack(pady=5)
     
     def update_question(self, course, question_id):
         """Update question in database"""
         try:
-            question_text = self.edit_question_text.get("1.0", tk.END).strip()
-            options = [
-                self.edit_option1.get().strip(),
-                self.edit_option2.get().strip(),
-                self.edit_option3.get().strip(),
-                self.edit_option4.get().strip()
-            ]
-            correct_idx = int(self.edit_correct_answer.get().strip()) - 1
-            
-            if not all(options) or correct_idx not in range(4):
-                raise ValueError("Invalid options or correct answer")
-            
-            conn = sqlite3.connect('quiz_bowl.db')
-            cursor = conn.cursor()
-            
-            cursor.execute(f'''
-            UPDATE {course} 
-            SET question_text = ?, option1 = ?, option2 = ?, option3 = ?, option4 = ?, correct_answer = ?
-            WHERE id = ?
-            ''', (question_text, *options, options[correct_idx], question_id))
-            
-            conn.commit()
-            conn.close()
-            
-            messagebox.showinfo("Success", "Question updated successfully!")
-            self.show_view_questions()
-            
+            question_text, options, correct_answer = quiz_db.validate_question(
+                self.edit_question_text.get("1.0", tk.END),
+                [
+                    self.edit_option1.get(),
+                    self.edit_option2.get(),
+                    self.edit_option3.get(),
+                    self.edit_option4.get()
+                ],
+                self.edit_correct_answer.get())
+        
         except Exception as e:
             messagebox.showerror("Error", f"Failed to update question: {str(e)}")
+            return
+        
+        # A write cannot be taken back once it has started, so no Cancel here
+        self.show_loading("Saving...", cancellable=False)
+        self.tasks.submit(lambda: self.question_cache.update_question(
+                              course, question_id, question_text, options, correct_answer,
+                              quiz_dedup.band_keys(question_text, options)),
+                          on_done=self.question_updated,
+                          on_error=lambda e: self.task_failed("Failed to update question", e))
+    
+    def question_updated(self, _):
+        """Return to the question list once an update is saved"""
+        self.hide_loading()
+        messagebox.showinfo("Success", "Question updated successfully!")
+        self.show_view_questions()
     
     def delete_selected_question(self):
-        """Delete selected question"""
-        selected = self.questions_tree.selection()
-        if not selected:
-            messagebox.showerror("Error", "Please select a question")
+        """Delete the selected questions in one transaction"""
+        items = self.selected_questions()
+        if not items:
             return
         
-        course = self.view_course_var.get()
+        if len(items) == 1:
+            prompt = "Are you sure you want to delete this question?"
+        else:
+            prompt = f"Are you sure you want to delete these {len(items)} questions?"
+        if messagebox.askyesno("Confirm", prompt):
+            iids = self.questions_tree.selection()
+            self.show_loading("Deleting...", cancellable=False)
+            self.tasks.submit(self.question_cache.delete_questions, items,
+                              on_done=lambda count: self.questions_deleted(iids, count),
+                              on_error=lambda e: self.task_failed("Failed to delete question", e))
+    
+    def questions_deleted(self, iids, count):
+        """Take deleted rows out of the question list without reloading it"""
+        self.hide_loading()
+        self.question_browser.remove_rows(iids)
+        if len(iids) == 1:
+            messagebox.showinfo("Success", "Question deleted successfully!")
+        else:
+            messagebox.showinfo("Success", f"{count} questions deleted successfully!")
+    
+    def move_selected_questions(self):
+        """Move the selected questions to another course in one transaction"""
+        items = self.selected_questions()
+        if not items:
+            return
+        target = self.move_course_var.get().strip()
+        if not target:
+            messagebox.showerror("Error", "Please select a course to move to")
+            return
+        
+        iids = self.questions_tree.selection()
+        self.show_loading("Moving...", cancellable=False)
+        self.tasks.submit(self.question_cache.move_questions, items, target,
+                          on_done=lambda count: self.questions_moved(iids, target, count),
+                          on_error=lambda e: self.task_failed("Failed to move questions", e))
+    
+    def questions_moved(self, iids, target, count):
+        """Update the question list after a move without reloading it"""
+        self.hide_loading()
+        self.question_browser.moved(iids, target)
+        messagebox.showinfo("Success", f"{count} questions moved to {target}")
+    
+    def replace_in_selected_options(self):
+        """Find and replace text in the options of the selected questions"""
+        items = self.selected_questions()
+        if not items:
+            return
+        find = self.find_entry.get()
+        if not find:
+            messagebox.showerror("Error", "Please enter the text to find")
+            return
+        
+        self.show_loading("Replacing...", cancellable=False)
+        self.tasks.submit(self.question_cache.replace_in_options, items, find,
+                          self.replace_entry.get(),
+                          on_done=self.options_replaced,
+                          on_error=lambda e: self.task_failed("Failed to replace text", e))
+    
+    def options_replaced(self, changed):
+        """Show the new correct answers of the edited questions in place"""
+        self.hide_loading()
+        self.question_browser.update_answers(
+            {question_id: row[5] for question_id, row in changed.items()})
+        messagebox.showinfo("Success", f"{len(changed)} questions updated")
+    
+    def show_statistics(self):
+        """Display score distribution and per-question statistics"""
+        self.show_screen("statistics", self.build_statistics)
+        self.stats_course_menu.config(values=self.question_cache.list_courses())
+    
+    def build_statistics(self, frame):
+        """Create the statistics widgets"""
+        tk.Label(frame, text="Quiz Statistics", font=("Arial", 16)).pack(pady=20)
+        
+        # Course selection
+        tk.Label(frame, text="Select Course:").pack()
+        self.stats_course_var = tk.StringVar()
+        self.stats_course_menu = ttk.Combobox(frame, textvariable=self.stats_course_var)
+        self.stats_course_menu.pack(pady=5)
+        tk.Button(frame, text="Show Statistics", 
+                 command=self.load_statistics).pack(pady=5)
+        
+        # Score histogram, one text bar per 10% bucket
+        self.stats_summary_label = tk.Label(frame, font=("Arial", 12))
+        self.stats_summary_label.pack(pady=5)
+        histogram = tk.Frame(frame)
+        histogram.pack(pady=5)
+        self.stats_bars = []
+        for bucket in range(quiz_db.SCORE_BUCKETS):
+            label = "100%" if bucket == quiz_db.SCORE_BUCKETS - 1 else f"{bucket * 10}-{bucket * 10 + 9}%"
+            tk.Label(histogram, text=label, width=8, anchor=tk.W).grid(row=bucket, column=0)
+            bar = tk.Label(histogram, width=50, anchor=tk.W, font=("Courier", 10))
+            bar.grid(row=bucket, column=1)
+            self.stats_bars.append(bar)
+        
+        # Treeview of the most-answered questions
+        tree_frame = tk.Frame(frame)
+        tree_frame.pack(pady=10, fill=tk.BOTH, expand=True)
+        columns = ("ID", "Question", "Attempts", "Difficulty", "Discrimination")
+        self.stats_tree = ttk.Treeview(tree_frame, columns=columns, show="headings")
+        for column in columns:
+            self.stats_tree.heading(column, text=column)
+        stats_scroll = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.stats_tree.yview)
+        self.stats_tree.configure(yscrollcommand=stats_scroll.set)
+        stats_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.stats_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        tk.Button(frame, text="Back", 
+                 command=self.show_admin_dashboard).pack(pady=10)
+    
+    def load_statistics(self):
+        """Fetch statistics for the selected course"""
+        course = self.stats_course_var.get()
         if not course:
             messagebox.showerror("Error", "Please select a course")
             return
         
-        item = self.questions_tree.item(selected[0])
-        question_id = item['values'][0]
-        
-        if messagebox.askyesno("Confirm", "Are you sure you want to delete this question?"):
-            try:
-                conn = sqlite3.connect('quiz_bowl.db')
-                cursor = conn.cursor()
-                
-                cursor.execute(f"DELETE FROM {course} WHERE id = ?", (question_id,))
-                
-                conn.commit()
-                conn.close()
-                
-                messagebox.showinfo("Success", "Question deleted successfully!")
-                self.load_questions_for_viewing()
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to delete question: {str(e)}")
-
+        self.show_loading("Loading statistics...")
+        self.tasks.submit(lambda: (course_report(course), item_report(course)),
+                          on_done=self.statistics_loaded,
+                          on_error=lambda e: self.task_failed("Failed to load statistics", e))
+    
+    def statistics_loaded(self, reports):
+        """Draw the histogram and fill the question statistics"""
+        self.hide_loading()
+        scores, items = reports
+        
+        self.stats_summary_label.config(
+            text=f"Quizzes taken: {scores['sessions']}    Average score: {scores['mean']:.1f}%")
+        largest = max(scores["buckets"]) or 1
+        for bar, count in zip(self.stats_bars, scores["buckets"]):
+            bar.config(text="#" * round(40 * count / largest) + f" {count}")
+        
+        self.stats_tree.delete(*self.stats_tree.get_children())
+        for question_id, text, attempts, difficulty, discrimination in items:
+            self.stats_tree.insert("", tk.END, values=(
+                question_id, text, attempts,
+                "-" if difficulty is None else f"{difficulty:.2f}",
+                "-" if discrimination is None else f"{discrimination:.2f}"))
+    
     def show_quiz_category_selection(self):
         """Display category selection for quiz taker"""
-        self.clear_window()
+        self.show_screen("quiz_categories", self.build_quiz_category_selection)
         
-        tk.Label(self.root, text="Select Quiz Category", font=("Arial", 16)).pack(pady=20)
-        
-        courses = ["BMGT", "DS3850", "DS3860", "Accounting", "History"]
-        
-        for course in courses:
-            tk.Button(self.root, text=course.replace("_", " "), 
-                     command=lambda c=course: self.start_quiz(c),
-                     width=20).pack(pady=5)
-        
-        tk.Button(self.root, text="Back to Main Menu", 
+        # Only the course buttons depend on data, and only when courses change
+        if self.question_pack is not None:
+            courses = self.question_pack.list_courses()
+        else:
+            courses = self.question_cache.list_courses()
+        if courses != self.category_courses:
+            for button in self.category_buttons.winfo_children():
+                button.destroy()
+            for course in courses:
+                tk.Button(self.category_buttons, text=course.replace("_", " "),
+                         command=lambda c=course: self.start_quiz(c),
+                         width=20).pack(pady=5)
+            self.category_courses = courses
+    
+    def build_quiz_category_selection(self, frame):
+        """Create the category selection widgets"""
+        tk.Label(frame, text="Select Quiz Category", font=("Arial", 16)).pack(pady=20)
+        
+        # Quiz length; "All" serves the whole course in order
+        tk.Label(frame, text="Number of Questions:").pack()
+        self.quiz_count_var = tk.StringVar(value="All")
+        ttk.Combobox(frame, textvariable=self.quiz_count_var, width=8,
+                     values=["All", "10", "20", "50", "100"]).pack(pady=5)
+        self.quiz_stratified_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(frame, text="Spread questions across the whole bank",
+                       variable=self.quiz_stratified_var).pack(pady=5)
+        self.quiz_adaptive_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(frame, text="Adaptive (questions match how well you are doing)",
+                       variable=self.quiz_adaptive_var).pack(pady=5)
+        
+        self.category_buttons = tk.Frame(frame)
+        self.category_buttons.pack()
+        self.category_courses = None
+        
+        tk.Button(frame, text="Back to Main Menu", 
                  command=self.show_main_menu, width=20).pack(pady=10)
     
     def start_quiz(self, course):
         """Start a quiz for the selected course"""
         try:
-            conn = sqlite3.connect('quiz_bowl.db')
-            cursor = conn.cursor()
-            
-            cursor.execute(f"SELECT * FROM {course}")
-            questions_data = cursor.fetchall()
-            conn.close()
-            
-            if not questions_data:
-                messagebox.showerror("Error", "No questions found for this course")
-                return
-            
-            # Convert to Question objects
-            self.quiz_questions = []
-            for q in questions_data:
-                options = [q[2], q[3], q[4], q[5]]  # option1 to option4
-                self.quiz_questions.append(Question(q[0], q[1], options, q[6]))
-            
-            self.current_question_index = 0
-            self.score = 0
-            self.show_quiz_question()
-            
+            count = self.quiz_count_var.get().strip()
+            count = None if count in ("", "All") else int(count)
+            if count is not None and count <= 0:
+                raise ValueError("Number of questions must be positive")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to start quiz: {str(e)}")
+            return
+        
+        self.show_loading("Loading quiz...")
+        self.tasks.submit(self.load_quiz, course, count, self.quiz_stratified_var.get(),
+                          self.quiz_adaptive_var.get(),
+                          self.question_pack if self.question_pack is not None else self.question_cache,
+                          on_done=self.quiz_loaded,
+                          on_error=lambda e: self.task_failed("Failed to start quiz", e))
+    
+    @staticmethod
+    def load_quiz(course, count, stratified, adaptive=False, source=None):
+        """Build a quiz session and load its first question (runs on a worker)"""
+        # Questions are loaded a few at a time as the quiz advances; adaptive
+        # quizzes always use the database, where difficulties are kept current
+        if adaptive:
+            session = AdaptiveQuizSession.start(course, count, stratified=stratified)
+        else:
+            session = QuizSession.start(course, count, stratified=stratified, source=source)
+        session.current_question()
+        return session
+    
+    def quiz_loaded(self, session):
+        """Show the first question of a freshly loaded quiz"""
+        self.hide_loading()
+        if not session.total:
+            messagebox.showerror("Error", "No questions found for this course")
+            return
+        
+        self.quiz_session = session
+        self.show_quiz_question()
     
     def show_quiz_question(self):
         """Display the current quiz question"""
-        self.clear_window()
-        
-        if self.current_question_index >= len(self.quiz_questions):
+        session = self.quiz_session
+        question = session.current_question()
+        if question is None:
             self.show_quiz_results()
             return
         
-        question = self.quiz_questions[self.current_question_index]
+        self.show_screen("quiz_question", self.build_quiz_question)
         
         # Question text
-        tk.Label(self.root, text=f"Question {self.current_question_index + 1} of {len(self.quiz_questions)}",
-                font=("Arial", 12)).pack(pady=5)
-        tk.Label(self.root, text=question.question_text, 
-                font=("Arial", 14), wraplength=700).pack(pady=10)
+        self.quiz_progress_label.config(text=f"Question {session.position + 1} of {session.total}")
+        self.quiz_question_label.config(text=question.question_text)
         
         # Options
-        self.selected_option = tk.StringVar()
         self.selected_option.set(None)  # No option selected initially
+        for button, option in zip(self.option_buttons, question.options):
+            button.config(text=option, value=option)
+        
+        # Score display
+        self.quiz_score_label.config(text=f"Current Score: {session.score}/{session.total}")
+    
+    def build_quiz_question(self, frame):
+        """Create the question, option and score widgets"""
+        self.quiz_progress_label = tk.Label(frame, font=("Arial", 12))
+        self.quiz_progress_label.pack(pady=5)
+        self.quiz_question_label = tk.Label(frame, font=("Arial", 14), wraplength=700)
+        self.quiz_question_label.pack(pady=10)
         
-        for i, option in enumerate(question.options, start=1):
-            tk.Radiobutton(self.root, text=option, variable=self.selected_option,
-                          value=option, font=("Arial", 12), wraplength=700).pack(anchor=tk.W, padx=20)
+        self.selected_option = tk.StringVar()
+        self.option_buttons = []
+        for i in range(4):
+            button = tk.Radiobutton(frame, variable=self.selected_option,
+                                    font=("Arial", 12), wraplength=700)
+            button.pack(anchor=tk.W, padx=20)
+            self.option_buttons.append(button)
         
         # Submit button
-        tk.Button(self.root, text="Submit Answer", 
+        tk.Button(frame, text="Submit Answer", 
                  command=self.check_quiz_answer, width=20).pack(pady=20)
         
-        # Score display
-        tk.Label(self.root, text=f"Current Score: {self.score}/{len(self.quiz_questions)}",
-                font=("Arial", 12)).pack(pady=10)
+        self.quiz_score_label = tk.Label(frame, font=("Arial", 12))
+        self.quiz_score_label.pack(pady=10)
     
     def check_quiz_answer(self):
         """Check the submitted answer and provide feedback"""
-        if not self.selected_option.get():
-            messagebox.showerror("Error", "Please select an answer")
+        try:
+            is_correct, correct_answer = self.quiz_session.submit_answer(self.selected_option.get())
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
             return
-        
-        question = self.quiz_questions[self.current_question_index]
-        is_correct = question.check_answer(self.selected_option.get())
+        flush_due = self.attempt_log.record(self.quiz_session, is_correct)
         
         if is_correct:
-            self.score += 1
             messagebox.showinfo("Correct", "Your answer is correct!")
         else:
             messagebox.showerror("Incorrect", 
-                               f"Wrong answer. The correct answer is: {question.correct_answer}")
+                               f"Wrong answer. The correct answer is: {correct_answer}")
         
-        self.current_question_index += 1
         self.show_quiz_question()
+        if flush_due or self.quiz_session.finished:
+            # Submitted after the screen change so it is not cancelled by it
+            self.tasks.submit(self.attempt_log.flush)
     
     def show_quiz_results(self):
         """Display final quiz results"""
-        self.clear_window()
+        self.show_screen("quiz_results", self.build_quiz_results)
         
-        tk.Label(self.root, text="Quiz Completed!", font=("Arial", 20)).pack(pady=20)
-        tk.Label(self.root, text=f"Your final score: {self.score}/{len(self.quiz_questions)}",
-                font=("Arial", 16)).pack(pady=10)
+        results = self.quiz_session.results()
         
-        percentage = (self.score / len(self.quiz_questions)) * 100
-        tk.Label(self.root, text=f"{percentage:.1f}%", font=("Arial", 14)).pack(pady=5)
-        
-        # Feedback based on score
-        if percentage >= 80:
-            feedback = "Excellent work!"
-        elif percentage >= 60:
-            feedback = "Good job!"
-        else:
-            feedback = "Keep practicing!"
-        
-        tk.Label(self.root, text=feedback, font=("Arial", 14)).pack(pady=10)
-        
-        tk.Button(self.root, text="Take Another Quiz", 
+        self.results_score_label.config(
+            text=f"Your final score: {results['score']}/{results['total']}")
+        percentage = f"{results['percentage']:.1f}%"
+        if "ability" in results:
+            percentage += f"  (ability estimate {results['ability']:+.2f})"
+        self.results_percentage_label.config(text=percentage)
+        self.results_feedback_label.config(text=results["feedback"])
+    
+    def build_quiz_results(self, frame):
+        """Create the results widgets"""
+        tk.Label(frame, text="Quiz Completed!", font=("Arial", 20)).pack(pady=20)
+        self.results_score_label = tk.Label(frame, font=("Arial", 16))
+        self.results_score_label.pack(pady=10)
+        self.results_percentage_label = tk.Label(frame, font=("Arial", 14))
+        self.results_percentage_label.pack(pady=5)
+        self.results_feedback_label = tk.Label(frame, font=("Arial", 14))
+        self.results_feedback_label.pack(pady=10)
+        
+        tk.Button(frame, text="Take Another Quiz", 
                  command=self.show_quiz_category_selection, width=20).pack(pady=10)
-        tk.Button(self.root, text="Back to Main Menu", 
+        tk.Button(frame, text="Back to Main Menu", 
                  command=self.show_main_menu, width=20).pack(pady=5)
         
 if __name__ == "__main__":
+    # QUIZ_TRACE=trace.json (or .prom) times DB calls and screens into that file
+    trace_path = quiz_trace.enable_from_env(QuizBowlApp)
     root = tk.Tk()
     app = QuizBowlApp(root)
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
+    app.tasks.shutdown()
+    app.attempt_log.flush()
+    if trace_path:
+        quiz_trace.dump(trace_path)
\ No newline at end of file
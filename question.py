@@ -0,0 +1,17 @@
+class Question:
+    def __init__(self, question_id, question_text, options, correct_answer):
+        self.question_id = question_id
+        self.question_text = question_text
+        self.options = options
+        self.correct_answer = correct_answer
+    
+    def check_answer(self, user_answer):
+        return user_answer == self.correct_answer
+    
+    def display_question(self):
+        return {
+            "id": self.question_id,
+            "text": self.question_text,
+            "options": self.options,
+            "correct_answer": self.correct_answer
+        }
@@ -0,0 +1,169 @@
+"""Compact column-oriented storage for large in-memory question banks.
+
+A QuestionBank keeps every question in a handful of flat arrays instead of
+one Python object per question:
+
+* ids           array('q'), one entry per question
+* text          one UTF-8 bytearray holding the question text and the four
+                options of every question back to back
+* offsets       array('Q') of string boundaries into text, five strings per
+                question, so question i spans offsets[5*i] .. offsets[5*i+5]
+* correct       array('b') holding the 0-3 index of the right option
+
+Indexing the bank returns a QuestionView, a two-slot object that decodes
+fields on access and offers the same check_answer/display_question API as
+Question.
+
+    python question_bank.py 100000
+
+prints the measured memory per question next to a list of Question objects.
+"""
+import sys
+import tracemalloc
+from array import array
+
+import quiz_db
+from question import Question
+
+FIELDS_PER_QUESTION = 5  # question text + four options
+
+
+class QuestionView:
+    """Lightweight read-only view of one question in a QuestionBank"""
+
+    __slots__ = ("_bank", "_index")
+
+    def __init__(self, bank, index):
+        self._bank = bank
+        self._index = index
+
+    @property
+    def question_id(self):
+        return self._bank._ids[self._index]
+
+    @property
+    def question_text(self):
+        return self._bank._field(self._index, 0)
+
+    @property
+    def options(self):
+        return [self._bank._field(self._index, i) for i in range(1, FIELDS_PER_QUESTION)]
+
+    @property
+    def correct_index(self):
+        return self._bank._correct[self._index]
+
+    @property
+    def correct_answer(self):
+        return self._bank._field(self._index, self.correct_index + 1)
+
+    def check_answer(self, user_answer):
+        return user_answer == self.correct_answer
+
+    def display_question(self):
+        return {
+            "id": self.question_id,
+            "text": self.question_text,
+            "options": self.options,
+            "correct_answer": self.correct_answer
+        }
+
+    def __repr__(self):
+        return f"QuestionView(id={self.question_id})"
+
+
+class QuestionBank:
+    """Column-oriented container of questions"""
+
+    def __init__(self):
+        self._ids = array("q")
+        self._text = bytearray()
+        self._offsets = array("Q", [0])
+        self._correct = array("b")
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self._ids)
+        if index < 0 or index >= len(self._ids):
+            raise IndexError("question bank index out of range")
+        return QuestionView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self._ids)):
+            yield QuestionView(self, index)
+
+    def _field(self, index, field):
+        start = index * FIELDS_PER_QUESTION + field
+        return self._text[self._offsets[start]:self._offsets[start + 1]].decode("utf-8")
+
+    def append(self, question_id, question_text, options, correct_answer):
+        """Add a question; correct_answer is the text of the right option"""
+        if len(options) != FIELDS_PER_QUESTION - 1:
+            raise ValueError("A question needs exactly four options")
+        try:
+            correct_index = list(options).index(correct_answer)
+        except ValueError:
+            raise ValueError(f"Correct answer for question {question_id} is not one of its options")
+
+        for value in (question_text, *options):
+            self._text += value.encode("utf-8")
+            self._offsets.append(len(self._text))
+        self._ids.append(question_id)
+        self._correct.append(correct_index)
+
+    def extend_rows(self, rows):
+        """Append (id, question_text, option1..option4, correct_answer) rows"""
+        for row in rows:
+            self.append(row[0], row[1], row[2:6], row[6])
+        return self
+
+    @classmethod
+    def from_course(cls, course):
+        """Stream a course out of the database into a new bank"""
+        return cls().extend_rows(quiz_db.iter_questions(course))
+
+    def correct_indices(self):
+        """The answer key column as an array('b') of 0-3 option indices"""
+        return self._correct
+
+    def memory_usage(self):
+        """Bytes held by the bank's columns"""
+        return (sys.getsizeof(self._ids) + sys.getsizeof(self._text)
+                + sys.getsizeof(self._offsets) + sys.getsizeof(self._correct))
+
+    def bytes_per_question(self):
+        return self.memory_usage() / len(self) if len(self) else 0.0
+
+
+def measure_memory(count):
+    """Return (bank bytes/question, Question list bytes/question) for synthetic data"""
+    def rows():
+        for i in range(count):
+            options = [f"Option A {i}", f"Option B {i}", f"Option C {i}", f"Option D {i}"]
+            yield (i, f"Sample question {i} about something", *options, options[i % 4])
+
+    tracemalloc.start()
+    bank = QuestionBank().extend_rows(rows())
+    bank_bytes = tracemalloc.get_traced_memory()[0]
+    del bank
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    questions = [Question(r[0], r[1], list(r[2:6]), r[6]) for r in rows()]
+    object_bytes = tracemalloc.get_traced_memory()[0]
+    del questions
+    tracemalloc.stop()
+
+    return bank_bytes / count, object_bytes / count
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    bank_size, object_size = measure_memory(count)
+    print(f"{count} questions")
+    print(f"QuestionBank:      {bank_size:8.1f} bytes/question")
+    print(f"Question objects:  {object_size:8.1f} bytes/question")
+    print(f"Saving:            {object_size / bank_size:8.1f}x")
@@ -0,0 +1,247 @@
+"""Paginated, windowed question list for the admin View/Edit screen.
+
+QuestionBrowser drives a ttk.Treeview with keyset pages from
+quiz_db.fetch_question_page. Pages are fetched as the list is scrolled
+near either end, and rows that drift more than a few pages out of view are
+dropped again, so the widget never holds more than max_rows rows however
+big the course is. Clicking a column heading sorts by that column (each
+sortable column has its own index); clicking again reverses the order.
+
+Page queries go through run(fn, on_done, on_error), which by default calls
+fn in place; the app passes BackgroundRunner.submit so fetches happen on a
+worker thread. fetch defaults to quiz_db.fetch_question_page; the app
+passes its CourseCache's method of the same name.
+"""
+import quiz_db
+
+# Treeview column -> quiz_db.SORT_COLUMNS key
+COLUMN_SORT = {
+    "ID": "id",
+    "Question": "question",
+    "Correct Answer": "correct"
+}
+
+WINDOW_PAGES = 3        # pages kept in the Treeview at once
+EDGE_FRACTION = 0.1     # fetch more when the view is this close to an end
+END = "end"             # tkinter.END, without importing tkinter here
+
+
+def _run_in_place(fn, on_done, on_error):
+    try:
+        result = fn()
+    except Exception as e:
+        on_error(e)
+        return
+    on_done(result)
+
+
+class QuestionBrowser:
+    """Keyset-paginated view of one course in a ttk.Treeview"""
+
+    def __init__(self, tree, scrollbar, page_size=quiz_db.PAGE_SIZE, window_pages=WINDOW_PAGES,
+                 run=None, on_error=None, fetch=None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.page_size = page_size
+        self.max_rows = page_size * window_pages
+        self.course = None
+        self.sort = "id"
+        self.descending = False
+        self._keys = {}
+        self._courses = {}
+        self._more_above = False
+        self._more_below = False
+        self._busy = False
+        self._request = 0
+        self.run = run or _run_in_place
+        self.fetch = fetch or quiz_db.fetch_question_page
+        self.on_error = on_error
+
+        tree.configure(yscrollcommand=self._on_scroll)
+        scrollbar.configure(command=tree.yview)
+        for column, sort in COLUMN_SORT.items():
+            tree.heading(column, command=lambda s=sort: self.sort_by(s))
+
+    def _fetch(self, on_done, after=None, before=None):
+        """Fetch a page through run(); replies to superseded requests are ignored"""
+        self._request += 1
+        request = self._request
+        course, sort, descending = self.course, self.sort, self.descending
+
+        def deliver(rows):
+            if request == self._request:
+                on_done(rows)
+
+        def failed(error):
+            if request == self._request:
+                self._busy = False
+                if self.on_error:
+                    self.on_error(error)
+
+        self.run(lambda: self.fetch(course, sort, descending, after=after, before=before,
+                                    limit=self.page_size),
+                 on_done=deliver, on_error=failed)
+
+    def _key(self, row):
+        """(sort value, id) key of a row in the current sort order"""
+        value = {"id": row[0], "question": row[1], "correct": row[2]}[self.sort]
+        return (value, row[0])
+
+    def _insert(self, index, row):
+        iid = str(row[0])
+        self.tree.insert("", index, iid=iid, values=row)
+        self._keys[iid] = self._key(row)
+
+    def _remove(self, items):
+        self.tree.delete(*items)
+        for iid in items:
+            self._keys.pop(iid, None)
+            self._courses.pop(iid, None)
+
+    def course_of(self, iid):
+        """Course of a listed row (search results can span courses)"""
+        return self._courses.get(iid, self.course)
+
+    def show_results(self, rows):
+        """Replace the list with (id, course, question_text, correct_answer) search rows.
+
+        Paging stops until the next load().
+        """
+        self.cancel()
+        self.course = None
+        self.clear()
+        for row in rows:
+            iid = str(row[0])
+            self.tree.insert("", END, iid=iid, values=(row[0], row[2], row[3]))
+            self._courses[iid] = row[1]
+
+    def remove_rows(self, iids):
+        """Drop rows deleted (or moved away) in place, without refetching the page.
+
+        Reloads only if that empties the view while more rows exist.
+        """
+        self._remove([iid for iid in iids if self.tree.exists(iid)])
+        if not self.tree.get_children() and (self._more_above or self._more_below):
+            self.refresh()
+
+    def update_answers(self, answers):
+        """Show new {id: correct_answer} values in place after an options edit"""
+        for question_id, correct_answer in answers.items():
+            iid = str(question_id)
+            if self.tree.exists(iid):
+                values = self.tree.item(iid)["values"]
+                values = (values[0], values[1], correct_answer)
+                self.tree.item(iid, values=values)
+                if iid in self._keys:
+                    self._keys[iid] = self._key(values)
+
+    def moved(self, iids, course):
+        """Reflect rows moved to another course"""
+        if self.course is None:
+            for iid in iids:
+                if iid in self._courses:
+                    self._courses[iid] = course
+        elif course != self.course:
+            self.remove_rows(iids)
+
+    def load(self, course, on_done=None):
+        """Show the first page of a course in the current sort order"""
+        self.course = course
+        self._busy = True
+        self._update_headings()
+
+        def show(rows):
+            self.clear()
+            for row in rows:
+                self._insert(END, row)
+            self._more_below = len(rows) == self.page_size
+            self._busy = False
+            if on_done:
+                on_done()
+
+        self._fetch(show)
+
+    def refresh(self, on_done=None):
+        """Reload from the top, e.g. after the course has changed"""
+        if self.course is not None:
+            self.load(self.course, on_done)
+
+    def cancel(self):
+        """Forget any page request still in flight"""
+        self._request += 1
+        self._busy = False
+
+    def clear(self):
+        self._remove(self.tree.get_children())
+        self._more_above = False
+        self._more_below = False
+
+    def sort_by(self, sort):
+        """Sort by a column; a second click on the same column reverses it"""
+        if sort == self.sort:
+            self.descending = not self.descending
+        else:
+            self.sort, self.descending = sort, False
+        if self.course is None:
+            self._update_headings()
+        else:
+            self.load(self.course)
+
+    def _update_headings(self):
+        arrow = " ▼" if self.descending else " ▲"
+        for column, sort in COLUMN_SORT.items():
+            self.tree.heading(column, text=column + (arrow if sort == self.sort else ""))
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if self._busy or self.course is None:
+            return
+        # Defer the fetch: the Treeview must not be changed inside its own callback
+        if float(last) >= 1 - EDGE_FRACTION and self._more_below:
+            self._busy = True
+            self.tree.after_idle(self._load_below)
+        elif float(first) <= EDGE_FRACTION and self._more_above:
+            self._busy = True
+            self.tree.after_idle(self._load_above)
+
+    def _load_below(self):
+        children = self.tree.get_children()
+        if not children:
+            self._busy = False
+            return
+        anchor = children[-1]
+
+        def show(rows):
+            for row in rows:
+                self._insert(END, row)
+            self._more_below = len(rows) == self.page_size
+
+            children = self.tree.get_children()
+            if len(children) > self.max_rows:
+                self._remove(children[:len(children) - self.max_rows])
+                self._more_above = True
+            self.tree.see(anchor)
+            self._busy = False
+
+        self._fetch(show, after=self._keys[anchor])
+
+    def _load_above(self):
+        children = self.tree.get_children()
+        if not children:
+            self._busy = False
+            return
+        anchor = children[0]
+
+        def show(rows):
+            for index, row in enumerate(rows):
+                self._insert(index, row)
+            self._more_above = len(rows) == self.page_size
+
+            children = self.tree.get_children()
+            if len(children) > self.max_rows:
+                self._remove(children[self.max_rows:])
+                self._more_below = True
+            self.tree.see(anchor)
+            self._busy = False
+
+        self._fetch(show, before=self._keys[anchor])
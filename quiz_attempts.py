@@ -0,0 +1,119 @@
+"""Buffered attempts log and item analysis for finished quizzes.
+
+AttemptLog keeps answers in memory and writes them in batches, so taking a
+quiz never waits on a commit per click. A batch is due once it holds
+batch_size answers or is flush_interval seconds old, and is written when
+the owner calls flush(). When a quiz ends, its score is folded into
+running sums per question and per course (see quiz_db.record_attempts).
+The statistics below are computed from those sums alone:
+
+    difficulty      proportion of takers who answered the question right
+    discrimination  point-biserial correlation between getting it right and
+                    the taker's quiz score (near 0 or negative: the question
+                    does not separate strong takers from weak ones)
+"""
+import math
+import threading
+import time
+
+import quiz_db
+
+ATTEMPT_BATCH_SIZE = 200
+FLUSH_INTERVAL = 5.0
+
+
+class AttemptLog:
+    """Collects answers from any number of sessions and writes them in batches"""
+
+    def __init__(self, batch_size=ATTEMPT_BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._attempts = []
+        self._finished = []
+        self._open = {}
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def record(self, session, is_correct):
+        """Log the answer QuizSession.submit_answer just took.
+
+        Returns True when a batch is due; the caller then runs flush() on
+        whatever thread suits it (never the GUI or event-loop thread).
+        """
+        question_id = session.question_ids[session.position - 1]
+        with self._lock:
+            self._attempts.append((session.session_id, session.course, question_id,
+                                   session.responses[-1], int(is_correct), time.time()))
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            flags = self._open.setdefault(session.session_id, [])
+            flags.append(bool(is_correct))
+            if session.finished:
+                del self._open[session.session_id]
+                self._finished.append((session.course, list(session.question_ids), flags))
+            return (len(self._attempts) >= self.batch_size
+                    or time.monotonic() - self._oldest >= self.flush_interval)
+
+    def discard(self, session_id):
+        """Forget an abandoned session; its logged answers stay but add no stats"""
+        with self._lock:
+            self._open.pop(session_id, None)
+
+    @property
+    def pending(self):
+        """Answers waiting to be written"""
+        return len(self._attempts)
+
+    def flush(self):
+        """Write everything buffered in one transaction; returns the answers written"""
+        with self._flush_lock:
+            with self._lock:
+                attempts, finished = self._attempts, self._finished
+                self._attempts, self._finished = [], []
+                self._oldest = None
+            if not attempts and not finished:
+                return 0
+            try:
+                quiz_db.record_attempts(attempts, finished)
+            except Exception:
+                # Put the batch back so the next flush retries it
+                with self._lock:
+                    self._attempts[:0] = attempts
+                    self._finished[:0] = finished
+                    self._oldest = self._oldest or time.monotonic()
+                raise
+            return len(attempts)
+
+
+def item_difficulty(attempts, correct):
+    """Proportion correct, or None before anyone has answered"""
+    return correct / attempts if attempts else None
+
+
+def point_biserial(attempts, correct, score_sum, score_sq_sum, correct_score_sum):
+    """Point-biserial correlation from running sums, or None if undefined"""
+    if not attempts or correct in (0, attempts):
+        return None
+    mean = score_sum / attempts
+    variance = score_sq_sum / attempts - mean * mean
+    if variance <= 1e-12:
+        return None
+    p = correct / attempts
+    mean_right = correct_score_sum / correct
+    mean_wrong = (score_sum - correct_score_sum) / (attempts - correct)
+    return (mean_right - mean_wrong) / math.sqrt(variance) * math.sqrt(p * (1 - p))
+
+
+def item_report(course, limit=quiz_db.ITEM_STATS_LIMIT):
+    """Return (id, question_text, attempts, difficulty, discrimination) rows"""
+    return [(question_id, text, attempts, item_difficulty(attempts, correct),
+             point_biserial(attempts, correct, score_sum, score_sq_sum, correct_score_sum))
+            for question_id, text, attempts, correct, score_sum, score_sq_sum, correct_score_sum
+            in quiz_db.item_statistics(course, limit)]
+
+
+def course_report(course):
+    """Return {"buckets", "sessions", "mean"} for a course's score distribution"""
+    counts, mean = quiz_db.score_distribution(course)
+    return {"buckets": counts, "sessions": sum(counts), "mean": mean}
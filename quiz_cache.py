@@ -0,0 +1,358 @@
+"""In-memory cache of whole courses, written through on every edit.
+
+CourseCache keeps the questions of recently used courses in memory, least
+recently used first out. It is bounded by max_courses courses and about
+max_bytes of question data; a course with more than max_questions
+questions (or over max_bytes on its own) is never cached, and calls for it
+go to the database as before, where the indexes already make them cheap.
+
+It offers the read calls the app repeats most, with the same arguments and
+results as their quiz_db counterparts: list_courses, get_question,
+fetch_question_page (id order only; other orders go to the database) and,
+for QuizSession.start, list_question_ids, sample_question_ids and quiz().
+Only the quiz-start calls load a course on a miss (they run on a worker
+thread); get_question and fetch_question_page use a course only if it is
+already cached and otherwise make their one indexed query, so they never
+stall the GUI loading a whole course. Once a course is cached, starting a
+quiz on it does no database I/O.
+
+Edits must go through add_question, update_question and delete_question
+here (or their bulk forms delete_questions, move_questions and
+replace_in_options): each writes to the database first and then patches
+the cached rows, so the cache never has to be thrown away after an edit.
+Changes made by other processes are not seen until an entry is max_age
+seconds old and gets reloaded.
+
+stats() returns hit/miss/eviction counters for tuning the limits.
+"""
+import bisect
+import random
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+import quiz_db
+from question import Question
+from quiz_sampling import LazyQuiz, sample_question_ids
+
+MAX_COURSES = 8
+MAX_BYTES = 64 * 1024 * 1024
+MAX_QUESTIONS = 50000
+MAX_AGE = 600.0          # seconds before an entry is reloaded from the database
+ROW_OVERHEAD = 120       # dict slot and id array entry per cached question
+REBUILD_AT = 64          # bulk removals past this rebuild the id array in one pass
+
+
+def _row_size(row):
+    return sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row) + ROW_OVERHEAD
+
+
+class CourseEntry:
+    """One cached course: sorted ids plus (question_text, option1..4, correct) rows"""
+
+    def __init__(self):
+        self.ids = array("q")
+        self.rows = {}
+        self.bytes = 0
+        self.loaded_at = time.monotonic()
+
+    def put(self, question_id, row):
+        old = self.rows.get(question_id)
+        if old is None:
+            index = bisect.bisect_left(self.ids, question_id)
+            self.ids.insert(index, question_id)
+        else:
+            self.bytes -= _row_size(old)
+        self.rows[question_id] = row
+        self.bytes += _row_size(row)
+
+    def remove(self, question_id):
+        row = self.rows.pop(question_id, None)
+        if row is not None:
+            del self.ids[bisect.bisect_left(self.ids, question_id)]
+            self.bytes -= _row_size(row)
+
+    def remove_many(self, question_ids):
+        """remove() for many ids; past REBUILD_AT it rebuilds the id array once instead"""
+        gone = {question_id for question_id in question_ids if question_id in self.rows}
+        if len(gone) < REBUILD_AT:
+            for question_id in gone:
+                self.remove(question_id)
+            return
+        for question_id in gone:
+            self.bytes -= _row_size(self.rows.pop(question_id))
+        self.ids = array("q", (question_id for question_id in self.ids if question_id not in gone))
+
+
+class CachedQuiz:
+    """Sequence of Question objects built from a cached course"""
+
+    def __init__(self, entry, question_ids):
+        self.entry = entry
+        self.question_ids = list(question_ids)
+
+    def __len__(self):
+        return len(self.question_ids)
+
+    def __getitem__(self, index):
+        question_id = self.question_ids[index]
+        row = self.entry.rows.get(question_id)
+        if row is None:
+            raise LookupError(f"Question {question_id} no longer exists")
+        return Question(question_id, row[0], list(row[1:5]), row[5])
+
+
+class CourseCache:
+    """Bounded LRU cache of courses with write-through edits"""
+
+    def __init__(self, max_courses=MAX_COURSES, max_bytes=MAX_BYTES,
+                 max_questions=MAX_QUESTIONS, max_age=MAX_AGE):
+        self.max_courses = max_courses
+        self.max_bytes = max_bytes
+        self.max_questions = max_questions
+        self.max_age = max_age
+        self._entries = OrderedDict()
+        self._too_big = {}          # course -> when it was found too big to cache
+        self._generation = {}       # course -> edits so far, to spot loads racing an edit
+        self._courses = None
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.bypasses = 0
+        self.evictions = self.patches = 0
+
+    def _expired(self, loaded_at):
+        return self.max_age is not None and time.monotonic() - loaded_at > self.max_age
+
+    def _entry(self, course):
+        """The cached course, loading it on a miss; None if it is not cacheable"""
+        with self._lock:
+            entry = self._entries.get(course)
+            if entry is not None and not self._expired(entry.loaded_at):
+                self._entries.move_to_end(course)
+                self.hits += 1
+                return entry
+            too_big = self._too_big.get(course)
+            if too_big is not None and not self._expired(too_big):
+                self.bypasses += 1
+                return None
+            self.misses += 1
+            generation = self._generation.get(course, 0)
+
+        entry = None
+        if len(quiz_db.list_question_ids(course, limit=self.max_questions + 1)) <= self.max_questions:
+            entry = CourseEntry()
+            for row in quiz_db.iter_questions(course):
+                entry.put(row[0], row[1:])
+
+        with self._lock:
+            self._entries.pop(course, None)
+            if entry is None or entry.bytes > self.max_bytes:
+                self._too_big[course] = time.monotonic()
+                return None
+            self._too_big.pop(course, None)
+            # An edit that landed while loading may be missing from entry
+            if self._generation.get(course, 0) == generation:
+                self._entries[course] = entry
+                self._evict()
+        return entry
+
+    def _cached(self, course):
+        """The cached course if it is loaded and fresh, else None; never loads"""
+        with self._lock:
+            entry = self._entries.get(course)
+            if entry is not None and not self._expired(entry.loaded_at):
+                self._entries.move_to_end(course)
+                self.hits += 1
+                return entry
+            self.bypasses += 1
+            return None
+
+    def _evict(self):
+        total = sum(entry.bytes for entry in self._entries.values())
+        while self._entries and (len(self._entries) > self.max_courses or total > self.max_bytes):
+            _, entry = self._entries.popitem(last=False)
+            total -= entry.bytes
+            self.evictions += 1
+
+    def _patch(self, course, change):
+        with self._lock:
+            self._generation[course] = self._generation.get(course, 0) + 1
+            entry = self._entries.get(course)
+            if entry is not None:
+                change(entry)
+                self.patches += 1
+                self._evict()
+
+    # Reads
+
+    def list_courses(self):
+        with self._lock:
+            courses, loaded_at = self._courses or (None, None)
+            if courses is not None and not self._expired(loaded_at):
+                self.hits += 1
+                return list(courses)
+            self.misses += 1
+        courses = quiz_db.list_courses()
+        with self._lock:
+            self._courses = (courses, time.monotonic())
+        return list(courses)
+
+    def get_question(self, course, question_id):
+        """Return (question_text, option1..option4, correct_answer) or None"""
+        entry = self._cached(course)
+        if entry is None:
+            return quiz_db.get_question(course, question_id)
+        return entry.rows.get(question_id)
+
+    def list_question_ids(self, course):
+        entry = self._entry(course)
+        if entry is None:
+            return quiz_db.list_question_ids(course)
+        return entry.ids.tolist()
+
+    def sample_question_ids(self, course, count, stratified=False, rng=random):
+        """Same contract as quiz_sampling.sample_question_ids"""
+        entry = self._entry(course)
+        if entry is None:
+            return sample_question_ids(course, count, stratified=stratified, rng=rng)
+        ids = entry.ids
+        if count <= 0:
+            return []
+        if len(ids) <= count:
+            chosen = ids.tolist()
+            rng.shuffle(chosen)
+            return chosen
+        if stratified:
+            width = len(ids) / count
+            return [ids[int((i + rng.random()) * width)] for i in range(count)]
+        return [ids[i] for i in rng.sample(range(len(ids)), count)]
+
+    def quiz(self, course, question_ids):
+        """The questions for these ids, in order"""
+        entry = self._entry(course)
+        if entry is None:
+            return LazyQuiz(question_ids)
+        return CachedQuiz(entry, question_ids)
+
+    def fetch_question_page(self, course, sort="id", descending=False, after=None, before=None,
+                            limit=quiz_db.PAGE_SIZE):
+        """Same as quiz_db.fetch_question_page; served from memory in id order"""
+        entry = self._cached(course) if sort == "id" else None
+        if entry is None:
+            return quiz_db.fetch_question_page(course, sort, descending, after=after,
+                                               before=before, limit=limit)
+        backwards = before is not None
+        key = before if backwards else after
+        ids = entry.ids
+        if descending == backwards:
+            start = bisect.bisect_right(ids, key[1]) if key is not None else 0
+            page = ids[start:start + limit].tolist()
+        else:
+            end = bisect.bisect_left(ids, key[1]) if key is not None else len(ids)
+            page = ids[max(0, end - limit):end].tolist()[::-1]
+        if backwards:
+            page.reverse()
+        return [(question_id, entry.rows[question_id][0], entry.rows[question_id][5])
+                for question_id in page]
+
+    # Writes: the database first, then the cached row
+
+    def add_course(self, course):
+        quiz_db.add_course(course)
+        with self._lock:
+            self._courses = None
+
+    def add_question(self, course, question_text, options, correct_answer, bands=None):
+        """Insert a question and return its id"""
+        question_id = quiz_db.add_question(course, question_text, options, correct_answer,
+                                           bands=bands)
+        row = (question_text, *options, correct_answer)
+        self._patch(course, lambda entry: entry.put(question_id, row))
+        return question_id
+
+    def update_question(self, course, question_id, question_text, options, correct_answer,
+                        bands=None):
+        quiz_db.update_question(course, question_id, question_text, options, correct_answer,
+                                bands=bands)
+        row = (question_text, *options, correct_answer)
+
+        def change(entry):
+            if question_id in entry.rows:
+                entry.put(question_id, row)
+        self._patch(course, change)
+
+    def delete_question(self, course, question_id):
+        quiz_db.delete_question(course, question_id)
+        self._patch(course, lambda entry: entry.remove(question_id))
+
+    # Bulk writes take (course, question_id) pairs and run as one transaction each
+
+    @staticmethod
+    def _by_course(items):
+        courses = {}
+        for course, question_id in items:
+            courses.setdefault(course, []).append(question_id)
+        return courses
+
+    def delete_questions(self, items):
+        """Delete many questions; returns how many were deleted"""
+        courses = self._by_course(items)
+        deleted = quiz_db.delete_questions([question_id for ids in courses.values()
+                                            for question_id in ids])
+        for course, ids in courses.items():
+            self._patch(course, lambda entry, ids=ids: entry.remove_many(ids))
+        return deleted
+
+    def move_questions(self, items, target):
+        """Move many questions to the target course; returns how many moved.
+
+        The target's cached entry is dropped rather than patched, since the
+        moved rows may not all be cached; it reloads on next use.
+        """
+        courses = self._by_course(items)
+        moved = quiz_db.move_questions([question_id for ids in courses.values()
+                                        for question_id in ids], target)
+        for course, ids in courses.items():
+            if course != target:
+                self._patch(course, lambda entry, ids=ids: entry.remove_many(ids))
+        with self._lock:
+            self._generation[target] = self._generation.get(target, 0) + 1
+            self._entries.pop(target, None)
+            self._too_big.pop(target, None)
+        return moved
+
+    def replace_in_options(self, items, find, replace):
+        """Same as quiz_db.replace_in_options, for (course, question_id) pairs"""
+        courses = self._by_course(items)
+        changed = quiz_db.replace_in_options([question_id for ids in courses.values()
+                                              for question_id in ids], find, replace)
+        for course, ids in courses.items():
+            def change(entry, ids=ids):
+                for question_id in ids:
+                    if question_id in changed and question_id in entry.rows:
+                        entry.put(question_id, changed[question_id])
+            self._patch(course, change)
+        return changed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._too_big.clear()
+            self._courses = None
+
+    def stats(self):
+        """Counters and current size, for tuning the limits"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "bypasses": self.bypasses,
+                "evictions": self.evictions,
+                "patches": self.patches,
+                "courses": len(self._entries),
+                "questions": sum(len(entry.rows) for entry in self._entries.values()),
+                "bytes": sum(entry.bytes for entry in self._entries.values())
+            }
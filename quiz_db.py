@@ -0,0 +1,1050 @@
+import math
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+
+DB_PATH = 'quiz_bowl.db'
+
+# Stored in PRAGMA user_version; bump it whenever initialize_database changes
+SCHEMA_VERSION = 3
+
+# A handful of connections is plenty for a desktop app; WAL lets the
+# readers in the pool overlap with the single writer.
+POOL_SIZE = 4
+STATEMENT_CACHE_SIZE = 128
+BUSY_TIMEOUT = 30   # seconds a connection waits on another writer before "database is locked"
+
+# Courses registered in a fresh database; more can be added with add_course()
+DEFAULT_COURSES = [
+    "BMGT",
+    "DS3850",
+    "DS3860",
+    "Accounting",
+    "History"
+]
+
+# Admin browser paging; each sortable column has a (course, column, id) index
+PAGE_SIZE = 100
+SORT_COLUMNS = {
+    "id": "id",
+    "question": "question_text",
+    "correct": "correct_answer"
+}
+
+SEARCH_LIMIT = 200
+
+# Score histogram buckets: 0-9%, 10-19%, ... 90-99%, and 100%
+SCORE_BUCKETS = 11
+ITEM_STATS_LIMIT = 200
+
+# Ids bound per "IN (...)" query, under SQLite's bound-parameter limit
+ID_CHUNK = 10000
+
+# Rows moved per transaction when migrating the old one-table-per-course layout
+MIGRATION_BATCH_SIZE = 500
+LEGACY_COLUMNS = {"id", "question_text", "option1", "option2", "option3", "option4",
+                  "correct_answer"}
+
+
+# Set through set_tracer() by quiz_trace; None (the default) costs one check per borrow
+_tracer = None
+
+
+def set_tracer(tracer):
+    """Send each statement run on a pooled connection to tracer.statement(sql),
+    and rows changed per borrow to tracer.changes(n). None switches it off.
+    """
+    global _tracer
+    _tracer = tracer
+
+
+class ConnectionPool:
+    """Small pool of reusable SQLite connections to one database file"""
+
+    def __init__(self, path=DB_PATH, size=POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self):
+        """Open a connection configured for pooled use"""
+        # isolation_level=None leaves transaction control to transaction()
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None,
+                               check_same_thread=False,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def _acquire(self):
+        """Take an idle connection, opening a new one while under the limit"""
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                try:
+                    return self._connect()
+                except Exception:
+                    self._created -= 1
+                    raise
+        return self._idle.get()
+
+    def _release(self, conn):
+        """Return a connection to the pool"""
+        if conn.in_transaction:
+            conn.rollback()
+        if self._closed:
+            conn.close()
+        else:
+            self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for reads (autocommit)"""
+        conn = self._acquire()
+        tracer = _tracer
+        if tracer is not None:
+            conn.set_trace_callback(tracer.statement)
+            changes = conn.total_changes
+        try:
+            yield conn
+        finally:
+            if tracer is not None:
+                conn.set_trace_callback(None)
+                tracer.changes(conn.total_changes - changes)
+            self._release(conn)
+
+    @contextmanager
+    def transaction(self):
+        """Borrow a connection inside BEGIN IMMEDIATE ... COMMIT"""
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.execute("COMMIT")
+
+    def close(self):
+        """Close every idle connection; borrowed ones close on release"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the shared pool for DB_PATH, creating it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_PATH)
+    return _pool
+
+
+def set_database(path):
+    """Point the shared pool at a different database file"""
+    global DB_PATH, _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        DB_PATH = path
+        _pool = None
+
+
+def copy_database(path):
+    """Copy a live database (WAL included) to a temporary file with the backup API"""
+    handle, copy = tempfile.mkstemp(prefix="quiz_copy_", suffix=".db")
+    os.close(handle)
+    source = sqlite3.connect(path)
+    target = sqlite3.connect(copy)
+    try:
+        source.backup(target)
+    finally:
+        source.close()
+        target.close()
+    return copy
+
+
+def remove_database(path):
+    """Delete a database file along with its -wal and -shm files"""
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def _require_course(conn, course):
+    """Raise ValueError unless the course is in the registry"""
+    if conn.execute("SELECT 1 FROM courses WHERE name = ?", (course,)).fetchone() is None:
+        raise ValueError(f"Unknown course: {course}")
+
+
+def schema_version():
+    """Return the schema version recorded in the database file (0 if new)"""
+    with get_pool().connection() as conn:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def initialize_database(seed=True):
+    """Bring the database up to SCHEMA_VERSION.
+
+    A database that is already current costs a single PRAGMA read. A new
+    file gets the schema and, unless seed is False, the sample questions
+    once; an older one is upgraded and its old course tables migrated.
+    Returns True if anything had to be done.
+    """
+    version = schema_version()
+    if version == SCHEMA_VERSION:
+        return False
+    if version > SCHEMA_VERSION:
+        raise sqlite3.DatabaseError(
+            f"Database schema version {version} is newer than this app ({SCHEMA_VERSION})")
+
+    with get_pool().transaction() as conn:
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS courses (
+            name TEXT PRIMARY KEY,
+            position INTEGER NOT NULL DEFAULT 0
+        )
+        ''')
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS questions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            course TEXT NOT NULL REFERENCES courses(name) ON UPDATE CASCADE,
+            question_text TEXT NOT NULL,
+            option1 TEXT NOT NULL,
+            option2 TEXT NOT NULL,
+            option3 TEXT NOT NULL,
+            option4 TEXT NOT NULL,
+            correct_answer TEXT NOT NULL,
+            difficulty REAL NOT NULL DEFAULT 0
+        )
+        ''')
+        _add_difficulty_column(conn)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_questions_course ON questions (course, id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_questions_text "
+                     "ON questions (course, question_text, id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_questions_correct "
+                     "ON questions (course, correct_answer, id)")
+        conn.executemany("INSERT OR IGNORE INTO courses (name, position) VALUES (?, ?)",
+                         [(course, i) for i, course in enumerate(DEFAULT_COURSES)])
+        _create_search_index(conn)
+        _create_attempt_tables(conn)
+        _create_band_table(conn)
+        # Version 2: difficulty calibrated from the answers logged so far
+        if version < 2:
+            _calibrate_difficulty(conn)
+
+    # Resumable: if it is interrupted the version is not bumped and it runs again
+    migrate_legacy_tables()
+
+    if version == 0 and seed:
+        seed_sample_questions()
+
+    with get_pool().transaction() as conn:
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return True
+
+
+def seed_sample_questions(courses=None):
+    """Insert ten sample questions into each of the given courses that is empty.
+
+    Runs once when a database is created; call it again to fill courses
+    added later. Defaults to every registered course.
+    """
+    if courses is None:
+        courses = list_courses()
+    with get_pool().transaction() as conn:
+        for course in courses:
+            _require_course(conn, course)
+            if conn.execute("SELECT 1 FROM questions WHERE course = ? LIMIT 1",
+                            (course,)).fetchone() is None:
+                rows = [(
+                    course,
+                    f"Sample question {i} for {course}",
+                    "Option A",
+                    "Option B",
+                    "Option C",
+                    "Option D",
+                    "Option B"  # Sample correct answer
+                ) for i in range(1, 11)]
+                add_questions(rows, conn, _question_bands(rows))
+
+
+def _create_search_index(conn):
+    """Create the FTS5 index over question text and options, kept in sync by triggers.
+
+    Skipped (search falls back to LIKE) if this SQLite was built without FTS5.
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'questions_fts'").fetchone()
+    if exists:
+        return
+    try:
+        conn.execute('''
+        CREATE VIRTUAL TABLE questions_fts USING fts5(
+            question_text, option1, option2, option3, option4,
+            content='questions', content_rowid='id', prefix='2 3'
+        )
+        ''')
+    except sqlite3.OperationalError:
+        return
+
+    conn.execute('''
+    CREATE TRIGGER questions_fts_insert AFTER INSERT ON questions BEGIN
+        INSERT INTO questions_fts (rowid, question_text, option1, option2, option3, option4)
+        VALUES (new.id, new.question_text, new.option1, new.option2, new.option3, new.option4);
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER questions_fts_delete AFTER DELETE ON questions BEGIN
+        INSERT INTO questions_fts (questions_fts, rowid, question_text, option1, option2, option3, option4)
+        VALUES ('delete', old.id, old.question_text, old.option1, old.option2, old.option3, old.option4);
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER questions_fts_update AFTER UPDATE OF question_text, option1, option2, option3, option4
+    ON questions BEGIN
+        INSERT INTO questions_fts (questions_fts, rowid, question_text, option1, option2, option3, option4)
+        VALUES ('delete', old.id, old.question_text, old.option1, old.option2, old.option3, old.option4);
+        INSERT INTO questions_fts (rowid, question_text, option1, option2, option3, option4)
+        VALUES (new.id, new.question_text, new.option1, new.option2, new.option3, new.option4);
+    END
+    ''')
+    # Index whatever was already in the table
+    conn.execute("INSERT INTO questions_fts (questions_fts) VALUES ('rebuild')")
+
+
+def _add_difficulty_column(conn):
+    """Add questions.difficulty (version 2) and its per-course index"""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(questions)")]
+    if "difficulty" not in columns:
+        conn.execute("ALTER TABLE questions ADD COLUMN difficulty REAL NOT NULL DEFAULT 0")
+    # Nearest-difficulty lookups for adaptive quizzes are one seek in this index
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_questions_difficulty "
+                 "ON questions (course, difficulty, id)")
+
+
+def difficulty_from_counts(attempts, correct):
+    """Calibrated difficulty on the logit scale: log((wrong + 1) / (right + 1)).
+
+    0 is average, positive is harder. The +1s keep the value finite and pull
+    rarely answered questions towards 0.
+    """
+    return math.log((attempts - correct + 1) / (correct + 1))
+
+
+def _calibrate_difficulty(conn, question_ids=None):
+    """Recompute questions.difficulty from item_stats (for all, or the given ids)"""
+    sql = "SELECT question_id, attempts, correct FROM item_stats"
+    params = []
+    if question_ids is not None:
+        question_ids = list(question_ids)
+        if not question_ids:
+            return
+        sql += f" WHERE question_id IN ({','.join('?' * len(question_ids))})"
+        params = question_ids
+    conn.executemany("UPDATE questions SET difficulty = ? WHERE id = ?", [
+        (difficulty_from_counts(attempts, correct), question_id)
+        for question_id, attempts, correct in conn.execute(sql, params).fetchall()])
+
+
+def _create_attempt_tables(conn):
+    """Create the attempts log and the running totals kept alongside it.
+
+    attempts is append-only. item_stats and score_buckets hold sums that
+    record_attempts() adds to, so statistics never need a scan of attempts.
+    """
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS attempts (
+        id INTEGER PRIMARY KEY,
+        session_id TEXT NOT NULL,
+        course TEXT NOT NULL,
+        question_id INTEGER NOT NULL,
+        chosen INTEGER NOT NULL,
+        correct INTEGER NOT NULL,
+        answered_at REAL NOT NULL
+    )
+    ''')
+    # Per question, over finished quizzes: n, right answers and the takers' scores
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS item_stats (
+        question_id INTEGER PRIMARY KEY,
+        course TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        correct INTEGER NOT NULL DEFAULT 0,
+        score_sum REAL NOT NULL DEFAULT 0,
+        score_sq_sum REAL NOT NULL DEFAULT 0,
+        correct_score_sum REAL NOT NULL DEFAULT 0
+    )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_item_stats_course "
+                 "ON item_stats (course, attempts)")
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS score_buckets (
+        course TEXT NOT NULL,
+        bucket INTEGER NOT NULL,
+        sessions INTEGER NOT NULL DEFAULT 0,
+        percentage_sum REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (course, bucket)
+    )
+    ''')
+
+
+def _create_band_table(conn):
+    """Create the near-duplicate index (version 3), filled in by quiz_dedup.
+
+    One row per (question, LSH band key). Questions sharing a key are
+    duplicate candidates; a question with no rows has not been indexed yet.
+    """
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS question_bands (
+        course TEXT NOT NULL REFERENCES courses(name) ON UPDATE CASCADE,
+        band_key INTEGER NOT NULL,
+        question_id INTEGER NOT NULL,
+        PRIMARY KEY (course, band_key, question_id)
+    ) WITHOUT ROWID
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_question_bands_question "
+                 "ON question_bands (question_id)")
+
+
+def _set_bands(conn, course, question_id, bands):
+    conn.execute("DELETE FROM question_bands WHERE question_id = ?", (question_id,))
+    if bands is not None:
+        conn.executemany("INSERT OR IGNORE INTO question_bands (course, band_key, question_id) "
+                         "VALUES (?, ?, ?)", [(course, key, question_id) for key in bands])
+
+
+def _is_legacy_table(conn, name):
+    """True if name is a table with the old per-course column layout"""
+    columns = {row[0] for row in conn.execute("SELECT name FROM pragma_table_info(?)", (name,))}
+    return columns == LEGACY_COLUMNS
+
+
+def _legacy_tables(conn):
+    """Return registered course names that still have an old per-course table.
+
+    Only tables with the old column layout count, so a course named like
+    one of the app's own tables is never migrated.
+    """
+    return [row[0] for row in conn.execute('''
+    SELECT c.name FROM courses c
+    JOIN sqlite_master m ON m.type = 'table' AND m.name = c.name
+    ORDER BY c.position
+    ''') if _is_legacy_table(conn, row[0])]
+
+
+def migrate_legacy_tables(batch_size=MIGRATION_BATCH_SIZE):
+    """Move rows from the old one-table-per-course layout into questions.
+
+    Each batch is copied and deleted from the old table in its own short
+    transaction, so the app can keep working between batches and an
+    interrupted migration simply resumes where it stopped. A table is
+    dropped once it is empty. Returns the number of rows moved.
+    """
+    moved = 0
+    with get_pool().connection() as conn:
+        courses = _legacy_tables(conn)
+
+    for course in courses:
+        while True:
+            with get_pool().transaction() as conn:
+                rows = conn.execute(f'''
+                SELECT id, question_text, option1, option2, option3, option4, correct_answer
+                FROM "{course}" ORDER BY id LIMIT ?
+                ''', (batch_size,)).fetchall()
+                if not rows:
+                    conn.execute(f'DROP TABLE "{course}"')
+                    break
+                new_rows = [(course, *row[1:]) for row in rows]
+                add_questions(new_rows, conn, _question_bands(new_rows))
+                conn.execute(f'DELETE FROM "{course}" WHERE id <= ?', (rows[-1][0],))
+                moved += len(rows)
+    return moved
+
+
+def list_courses():
+    """Return the registered course names in display order"""
+    with get_pool().connection() as conn:
+        return [row[0] for row in conn.execute(
+            "SELECT name FROM courses ORDER BY position, name")]
+
+
+def add_course(course):
+    """Register a new course; no schema change is needed"""
+    course = course.strip()
+    if not course:
+        raise ValueError("Course name cannot be empty")
+    with get_pool().transaction() as conn:
+        # Table names are case-insensitive; an old per-course table is fine
+        reserved = course.lower().startswith("sqlite_") or conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = ? COLLATE NOCASE", (course,)).fetchone()
+        if reserved and not _is_legacy_table(conn, course):
+            raise ValueError(f"{course} is a reserved name")
+        conn.execute('''
+        INSERT OR IGNORE INTO courses (name, position)
+        VALUES (?, (SELECT COALESCE(MAX(position), -1) + 1 FROM courses))
+        ''', (course,))
+
+
+def validate_question(question_text, options, correct_number):
+    """Apply the add/edit form rules and return (question_text, options, correct_answer).
+
+    options must be four non-empty strings and correct_number the 1-based
+    position of the right one. Raises ValueError otherwise.
+    """
+    question_text = question_text.strip()
+    options = [option.strip() for option in options]
+    correct_idx = int(str(correct_number).strip()) - 1
+
+    if len(options) != 4 or not all(options) or correct_idx not in range(4):
+        raise ValueError("Invalid options or correct answer")
+
+    return question_text, options, options[correct_idx]
+
+
+def add_question(course, question_text, options, correct_answer, bands=None):
+    """Insert a question and return its id.
+
+    bands are its quiz_dedup.band_keys(), stored in the same transaction;
+    without them the question is left for quiz_dedup to index later.
+    """
+    with get_pool().transaction() as conn:
+        _require_course(conn, course)
+        cursor = conn.execute('''
+        INSERT INTO questions (course, question_text, option1, option2, option3, option4, correct_answer)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (course, question_text, *options, correct_answer))
+        if bands is not None:
+            _set_bands(conn, course, cursor.lastrowid, bands)
+        return cursor.lastrowid
+
+
+def _question_bands(rows):
+    """quiz_dedup band keys for (course, question_text, option1..option4, ...) rows"""
+    import quiz_dedup  # imports this module, so not at the top
+    return quiz_dedup.batch_band_keys([(row[1], row[2:6]) for row in rows])
+
+
+def add_questions(rows, conn=None, bands=None):
+    """Insert (course, question_text, option1..option4, correct_answer) rows.
+
+    bands, one list of quiz_dedup.band_keys() per row,
+    are stored in the same transaction; without them the rows go in as one
+    executemany and are left for quiz_dedup to index later. Pass conn to
+    join a caller's transaction.
+    """
+    if conn is None:
+        with get_pool().transaction() as conn:
+            return add_questions(rows, conn, bands)
+
+    sql = '''
+    INSERT INTO questions (course, question_text, option1, option2, option3, option4, correct_answer)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    '''
+    if bands is None:
+        conn.executemany(sql, rows)
+        return
+    band_rows = []
+    for row, keys in zip(rows, bands):
+        question_id = conn.execute(sql, row).lastrowid
+        band_rows.extend((row[0], key, question_id) for key in keys)
+    # In key order, so the inserts walk the primary key instead of jumping around it
+    band_rows.sort()
+    conn.executemany("INSERT OR IGNORE INTO question_bands (course, band_key, question_id) "
+                     "VALUES (?, ?, ?)", band_rows)
+
+
+def get_question(course, question_id):
+    """Return (question_text, option1..option4, correct_answer) or None"""
+    with get_pool().connection() as conn:
+        return conn.execute('''
+        SELECT question_text, option1, option2, option3, option4, correct_answer
+        FROM questions WHERE course = ? AND id = ?
+        ''', (course, question_id)).fetchone()
+
+
+def update_question(course, question_id, question_text, options, correct_answer, bands=None):
+    """Rewrite an existing question.
+
+    Its old duplicate-index keys are replaced by bands, or dropped (to be
+    re-indexed later) if bands is None.
+    """
+    with get_pool().transaction() as conn:
+        cursor = conn.execute('''
+        UPDATE questions
+        SET question_text = ?, option1 = ?, option2 = ?, option3 = ?, option4 = ?, correct_answer = ?
+        WHERE course = ? AND id = ?
+        ''', (question_text, *options, correct_answer, course, question_id))
+        if cursor.rowcount:
+            _set_bands(conn, course, question_id, bands)
+
+
+def delete_question(course, question_id):
+    """Remove a question"""
+    with get_pool().transaction() as conn:
+        cursor = conn.execute("DELETE FROM questions WHERE course = ? AND id = ?",
+                              (course, question_id))
+        # A stale (course, id) pair must not touch another course's question
+        if cursor.rowcount:
+            conn.execute("DELETE FROM item_stats WHERE question_id = ?", (question_id,))
+            conn.execute("DELETE FROM question_bands WHERE question_id = ?", (question_id,))
+
+
+def _id_chunks(question_ids, size=ID_CHUNK):
+    """Split ids into lists small enough for SQLite's bound-parameter limit"""
+    question_ids = list(question_ids)
+    for start in range(0, len(question_ids), size):
+        yield question_ids[start:start + size]
+
+
+def delete_questions(question_ids):
+    """Remove many questions in one transaction; returns how many were deleted"""
+    deleted = 0
+    with get_pool().transaction() as conn:
+        for chunk in _id_chunks(question_ids):
+            placeholders = ",".join("?" * len(chunk))
+            deleted += conn.execute(f"DELETE FROM questions WHERE id IN ({placeholders})",
+                                    chunk).rowcount
+            conn.execute(f"DELETE FROM item_stats WHERE question_id IN ({placeholders})", chunk)
+            conn.execute(f"DELETE FROM question_bands WHERE question_id IN ({placeholders})", chunk)
+    return deleted
+
+
+def move_questions(question_ids, course):
+    """Move many questions (with their statistics) to another course in one transaction.
+
+    Returns how many were moved. The attempts log keeps the course each
+    answer was given in.
+    """
+    moved = 0
+    with get_pool().transaction() as conn:
+        _require_course(conn, course)
+        for chunk in _id_chunks(question_ids):
+            placeholders = ",".join("?" * len(chunk))
+            moved += conn.execute(f"UPDATE questions SET course = ? WHERE id IN ({placeholders}) "
+                                  "AND course != ?", [course, *chunk, course]).rowcount
+            conn.execute(f"UPDATE item_stats SET course = ? WHERE question_id IN ({placeholders})",
+                         [course, *chunk])
+            conn.execute(f"UPDATE question_bands SET course = ? "
+                         f"WHERE question_id IN ({placeholders})", [course, *chunk])
+    return moved
+
+
+def replace_in_options(question_ids, find, replace):
+    """Replace text in the options of many questions in one transaction.
+
+    The correct answer follows its option. If any question would end up
+    with an empty option nothing is changed and ValueError is raised.
+    Edited questions get new duplicate-index keys in the same transaction.
+    Returns {id: (question_text, option1..option4, correct_answer)} for the
+    questions that changed.
+    """
+    if not find:
+        raise ValueError("Please enter the text to find")
+    changed = {}
+    courses = {}
+    with get_pool().transaction() as conn:
+        for chunk in _id_chunks(question_ids):
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(f'''
+            SELECT id, question_text, option1, option2, option3, option4, correct_answer, course
+            FROM questions WHERE id IN ({placeholders})
+              AND (instr(option1, ?) OR instr(option2, ?) OR instr(option3, ?) OR instr(option4, ?))
+            ''', [*chunk, find, find, find, find]).fetchall()
+            for row in rows:
+                old = row[2:6]
+                correct_number = old.index(row[6]) + 1 if row[6] in old else None
+                try:
+                    _, options, correct_answer = validate_question(
+                        row[1], [option.replace(find, replace) for option in old],
+                        correct_number or 1)
+                except ValueError as e:
+                    raise ValueError(f"Question {row[0]}: {e}")
+                if correct_number is None:
+                    correct_answer = row[6]
+                changed[row[0]] = (row[1], *options, correct_answer)
+                courses[row[0]] = row[7]
+        conn.executemany('''
+        UPDATE questions
+        SET option1 = ?, option2 = ?, option3 = ?, option4 = ?, correct_answer = ?
+        WHERE id = ?
+        ''', [(*row[1:], question_id) for question_id, row in changed.items()])
+        # Only keys that differ are rewritten: many bands survive a small edit
+        new = {(courses[question_id], key, question_id)
+               for question_id, bands in zip(changed, _question_bands(
+                   [(courses[question_id], *row) for question_id, row in changed.items()]))
+               for key in bands}
+        old = set()
+        for chunk in _id_chunks(changed):
+            old.update(conn.execute(f"SELECT course, band_key, question_id FROM question_bands "
+                                    f"WHERE question_id IN ({','.join('?' * len(chunk))})", chunk))
+        conn.executemany("DELETE FROM question_bands WHERE course = ? AND band_key = ? "
+                         "AND question_id = ?", sorted(old - new))
+        conn.executemany("INSERT OR IGNORE INTO question_bands (course, band_key, question_id) "
+                         "VALUES (?, ?, ?)", sorted(new - old))
+    return changed
+
+
+def fetch_question_page(course, sort="id", descending=False, after=None, before=None,
+                        limit=PAGE_SIZE):
+    """Return one keyset page of (id, question_text, correct_answer) rows.
+
+    after/before are the (sort value, id) key of a row already on screen;
+    the page holds the rows that follow or precede it in the chosen order.
+    Every page is an index range scan, however deep into the course it is.
+    SQLite only seeks on the first column of a (value, id) row-value
+    comparison, so rows tied with the key on the sort value are read with
+    their own query first, then the rows past that value.
+    """
+    column = SORT_COLUMNS[sort]
+    backwards = before is not None
+    key = before if backwards else after
+    ascending = descending == backwards
+    compare = ">" if ascending else "<"
+    direction = "ASC" if ascending else "DESC"
+
+    def page(conn, condition, order, params, count):
+        return conn.execute(f'''
+        SELECT id, question_text, correct_answer FROM questions
+        WHERE course = ?{condition}
+        ORDER BY {order} LIMIT ?
+        ''', (course, *params, count)).fetchall()
+
+    with get_pool().connection() as conn:
+        if key is None:
+            rows = page(conn, "", f"{column} {direction}, id {direction}", (), limit)
+        elif column == "id":
+            rows = page(conn, f" AND id {compare} ?", f"id {direction}", (key[1],), limit)
+        else:
+            rows = page(conn, f" AND {column} = ? AND id {compare} ?", f"id {direction}",
+                        key, limit)
+            if len(rows) < limit:
+                rows += page(conn, f" AND {column} {compare} ?",
+                             f"{column} {direction}, id {direction}", (key[0],),
+                             limit - len(rows))
+    if backwards:
+        rows.reverse()
+    return rows
+
+
+def _fts_query(text):
+    """Turn free text into an FTS5 query: every word must match, as a prefix"""
+    words = text.split()
+    return " ".join('"' + word.replace('"', '""') + '"*' for word in words)
+
+
+def search_questions(text, course=None, limit=SEARCH_LIMIT):
+    """Search question text and options in all courses (or one).
+
+    Returns (id, course, question_text, correct_answer) rows, best match
+    first; matches in the question text rank above matches in options.
+    """
+    query = _fts_query(text)
+    if not query:
+        return []
+
+    with get_pool().connection() as conn:
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'questions_fts'").fetchone():
+            sql = '''
+            SELECT q.id, q.course, q.question_text, q.correct_answer
+            FROM questions_fts f JOIN questions q ON q.id = f.rowid
+            WHERE questions_fts MATCH ?'''
+            params = [query]
+            if course:
+                sql += " AND q.course = ?"
+                params.append(course)
+            sql += " ORDER BY bm25(questions_fts, 10.0, 1.0, 1.0, 1.0, 1.0) LIMIT ?"
+            params.append(limit)
+            return conn.execute(sql, params).fetchall()
+
+        # No FTS5 in this SQLite build: slow substring scan
+        sql = "SELECT id, course, question_text, correct_answer FROM questions WHERE 1"
+        params = []
+        for word in text.split():
+            sql += (" AND (question_text LIKE ? OR option1 LIKE ? OR option2 LIKE ?"
+                    " OR option3 LIKE ? OR option4 LIKE ?)")
+            params.extend([f"%{word}%"] * 5)
+        if course:
+            sql += " AND course = ?"
+            params.append(course)
+        sql += " ORDER BY id LIMIT ?"
+        params.append(limit)
+        return conn.execute(sql, params).fetchall()
+
+
+def list_questions(course):
+    """Return (id, question_text, correct_answer) rows for the admin view"""
+    with get_pool().connection() as conn:
+        return conn.execute(
+            "SELECT id, question_text, correct_answer FROM questions WHERE course = ? ORDER BY id",
+            (course,)).fetchall()
+
+
+def load_questions(course):
+    """Return full question rows for a quiz"""
+    with get_pool().connection() as conn:
+        return conn.execute('''
+        SELECT id, question_text, option1, option2, option3, option4, correct_answer
+        FROM questions WHERE course = ? ORDER BY id
+        ''', (course,)).fetchall()
+
+
+def iter_questions(course, batch_size=1000):
+    """Yield full question rows for a course without materializing them all"""
+    with get_pool().connection() as conn:
+        cursor = conn.execute('''
+        SELECT id, question_text, option1, option2, option3, option4, correct_answer
+        FROM questions WHERE course = ? ORDER BY id
+        ''', (course,))
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+
+
+def get_answer_key(question_ids):
+    """Return the 0-3 correct option index for each id (-1 if unknown)"""
+    question_ids = list(question_ids)
+    key = {}
+    with get_pool().connection() as conn:
+        for chunk in _id_chunks(question_ids):
+            placeholders = ",".join("?" * len(chunk))
+            key.update(conn.execute(f'''
+            SELECT id, CASE correct_answer
+                WHEN option1 THEN 0 WHEN option2 THEN 1
+                WHEN option3 THEN 2 WHEN option4 THEN 3 ELSE -1 END
+            FROM questions WHERE id IN ({placeholders})
+            ''', chunk).fetchall())
+    return [key.get(question_id, -1) for question_id in question_ids]
+
+
+def question_id_range(course):
+    """Return (min_id, max_id) for a course, or (None, None) if it is empty"""
+    # Two separate lookups: SQLite only turns a lone MIN or MAX into an index seek
+    with get_pool().connection() as conn:
+        return conn.execute('''
+        SELECT (SELECT MIN(id) FROM questions WHERE course = ?),
+               (SELECT MAX(id) FROM questions WHERE course = ?)
+        ''', (course, course)).fetchone()
+
+
+def list_question_ids(course, limit=-1):
+    """Return a course's question ids in insertion order"""
+    with get_pool().connection() as conn:
+        return [row[0] for row in conn.execute(
+            "SELECT id FROM questions WHERE course = ? ORDER BY id LIMIT ?", (course, limit))]
+
+
+def seek_question_ids(course, targets):
+    """Return, for each target, the first question id >= target (None past the end).
+
+    Each lookup is one index seek, so cost does not depend on course size.
+    """
+    with get_pool().connection() as conn:
+        return [(conn.execute(
+            "SELECT id FROM questions WHERE course = ? AND id >= ? ORDER BY id LIMIT 1",
+            (course, target)).fetchone() or (None,))[0] for target in targets]
+
+
+def random_question_ids(course, count):
+    """Return up to count random ids using ORDER BY random() (scans the course)"""
+    with get_pool().connection() as conn:
+        return [row[0] for row in conn.execute(
+            "SELECT id FROM questions WHERE course = ? ORDER BY random() LIMIT ?",
+            (course, count))]
+
+
+def get_questions_by_ids(question_ids):
+    """Return full question rows for the given ids, keyed by id"""
+    rows = {}
+    with get_pool().connection() as conn:
+        for chunk in _id_chunks(question_ids):
+            rows.update((row[0], row) for row in conn.execute(f'''
+            SELECT id, question_text, option1, option2, option3, option4, correct_answer
+            FROM questions WHERE id IN ({",".join("?" * len(chunk))})
+            ''', chunk))
+    return rows
+
+
+def score_bucket(percentage):
+    """Histogram bucket (0 to SCORE_BUCKETS - 1) of a percentage score"""
+    return min(int(percentage // 10), SCORE_BUCKETS - 1)
+
+
+def record_attempts(attempts, sessions):
+    """Append answers to the attempts log and fold finished quizzes into the stats.
+
+    attempts are (session_id, course, question_id, chosen, correct,
+    answered_at) rows. sessions are (course, question_ids, correct_flags)
+    for quizzes that have ended; each adds its score to the course
+    histogram and to the running sums of every question it asked. All of
+    it is one transaction.
+    """
+    item_rows = []
+    bucket_rows = []
+    for course, question_ids, flags in sessions:
+        if not question_ids:
+            continue
+        score = sum(flags) / len(question_ids)
+        for question_id, correct in zip(question_ids, flags):
+            item_rows.append((question_id, course, int(correct), score, score * score,
+                              score if correct else 0.0))
+        bucket_rows.append((course, score_bucket(score * 100), score * 100))
+
+    with get_pool().transaction() as conn:
+        conn.executemany('''
+        INSERT INTO attempts (session_id, course, question_id, chosen, correct, answered_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ''', attempts)
+        conn.executemany('''
+        INSERT INTO item_stats (question_id, course, attempts, correct, score_sum,
+                                score_sq_sum, correct_score_sum)
+        VALUES (?, ?, 1, ?, ?, ?, ?)
+        ON CONFLICT (question_id) DO UPDATE SET
+            attempts = attempts + 1,
+            correct = correct + excluded.correct,
+            score_sum = score_sum + excluded.score_sum,
+            score_sq_sum = score_sq_sum + excluded.score_sq_sum,
+            correct_score_sum = correct_score_sum + excluded.correct_score_sum
+        ''', item_rows)
+        conn.executemany('''
+        INSERT INTO score_buckets (course, bucket, sessions, percentage_sum)
+        VALUES (?, ?, 1, ?)
+        ON CONFLICT (course, bucket) DO UPDATE SET
+            sessions = sessions + 1,
+            percentage_sum = percentage_sum + excluded.percentage_sum
+        ''', bucket_rows)
+        # Keep the difficulty index in step with the new answers
+        for chunk in _id_chunks({row[0] for row in item_rows}):
+            _calibrate_difficulty(conn, chunk)
+
+
+def item_statistics(course, limit=ITEM_STATS_LIMIT):
+    """Return the running sums of a course's most-answered questions.
+
+    Rows are (id, question_text, attempts, correct, score_sum,
+    score_sq_sum, correct_score_sum).
+    """
+    with get_pool().connection() as conn:
+        return conn.execute('''
+        SELECT s.question_id, q.question_text, s.attempts, s.correct, s.score_sum,
+               s.score_sq_sum, s.correct_score_sum
+        FROM item_stats s JOIN questions q ON q.id = s.question_id
+        WHERE s.course = ? ORDER BY s.attempts DESC LIMIT ?
+        ''', (course, limit)).fetchall()
+
+
+def score_distribution(course):
+    """Return (sessions per bucket, mean percentage) for a course's finished quizzes"""
+    counts = [0] * SCORE_BUCKETS
+    total = 0.0
+    with get_pool().connection() as conn:
+        for bucket, sessions, percentage_sum in conn.execute(
+                "SELECT bucket, sessions, percentage_sum FROM score_buckets WHERE course = ?",
+                (course,)):
+            counts[bucket] = sessions
+            total += percentage_sum
+    sessions = sum(counts)
+    return counts, (total / sessions if sessions else 0.0)
+
+
+def nearest_question(course, difficulty, exclude=(), start_id=0):
+    """Return (id, difficulty) of the course's question closest in difficulty,
+    skipping the ids in exclude, or None if there is none left.
+
+    Every lookup is a seek into idx_questions_difficulty that passes over at
+    most len(exclude) rows, so the cost does not grow with the size of the
+    course. Among questions of equal difficulty the search starts at
+    start_id; a random one spreads takers over them.
+    """
+    exclude = list(exclude)
+    skip = f" AND id NOT IN ({','.join('?' * len(exclude))})" if exclude else ""
+
+    def seek(conn, condition, order, *params):
+        return conn.execute(f'''
+        SELECT id, difficulty FROM questions
+        WHERE course = ? AND {condition}{skip}
+        ORDER BY {order} LIMIT 1
+        ''', (course, *params, *exclude)).fetchone()
+
+    # Ties are looked up separately: SQLite will not seek on (difficulty, id) row values
+    with get_pool().connection() as conn:
+        above = (seek(conn, "difficulty = ? AND id >= ?", "id", difficulty, start_id)
+                 or seek(conn, "difficulty > ?", "difficulty, id", difficulty))
+        below = (seek(conn, "difficulty = ? AND id < ?", "id DESC", difficulty, start_id)
+                 or seek(conn, "difficulty < ?", "difficulty DESC, id DESC", difficulty))
+    if above is None or below is None:
+        return above or below
+    return above if above[1] - difficulty <= difficulty - below[1] else below
+
+
+def set_question_bands(course, items):
+    """Store (question_id, band keys) pairs for questions that have none yet"""
+    # In key order, so the inserts walk the primary key instead of jumping around it
+    rows = sorted((course, key, question_id) for question_id, bands in items for key in bands)
+    with get_pool().transaction() as conn:
+        conn.executemany("INSERT OR IGNORE INTO question_bands (course, band_key, question_id) "
+                         "VALUES (?, ?, ?)", rows)
+
+
+def unindexed_questions(course, after=0, limit=1000):
+    """Return (id, question_text, option1..option4) rows with no band keys, ids > after"""
+    with get_pool().connection() as conn:
+        return conn.execute('''
+        SELECT id, question_text, option1, option2, option3, option4 FROM questions q
+        WHERE course = ? AND id > ?
+          AND NOT EXISTS (SELECT 1 FROM question_bands b WHERE b.question_id = q.id)
+        ORDER BY id LIMIT ?
+        ''', (course, after, limit)).fetchall()
+
+
+def band_matches(course, bands, limit):
+    """Questions sharing any of the band keys, as {id: (question_text, option1..4)}.
+
+    At most limit questions are taken per key, so a key shared by a flood
+    of templated questions costs no more than a rare one.
+    """
+    matches = {}
+    with get_pool().connection() as conn:
+        for key in bands:
+            for row in conn.execute('''
+            SELECT q.id, q.question_text, q.option1, q.option2, q.option3, q.option4
+            FROM question_bands b JOIN questions q ON q.id = b.question_id
+            WHERE b.course = ? AND b.band_key = ? LIMIT ?
+            ''', (course, key, limit)):
+                matches[row[0]] = row[1:]
+    return matches
+
+
+def band_buckets(course, max_size):
+    """Yield the id lists of a course's band keys shared by 2 to max_size questions"""
+    with get_pool().connection() as conn:
+        cursor = conn.execute('''
+        SELECT group_concat(question_id) FROM question_bands
+        WHERE course = ? GROUP BY band_key HAVING COUNT(*) BETWEEN 2 AND ?
+        ''', (course, max_size))
+        for (ids,) in cursor:
+            yield [int(question_id) for question_id in ids.split(",")]
@@ -0,0 +1,246 @@
+"""Near-duplicate question detection with MinHash and locality-sensitive hashing.
+
+A question is turned into a set of shingles: the words and word pairs of
+its text, plus each option as a whole (so reordered options still match).
+Two questions are near duplicates when the Jaccard similarity of their
+shingle sets (shared / all) is at least THRESHOLD.
+
+Comparing every pair is O(n^2), so each question instead gets a MinHash
+signature of NUM_HASHES values, cut into BANDS bands of ROWS values. Each
+band is hashed to a key stored in quiz_db's question_bands table, and two
+questions become candidates only if they share a key. With 16 bands of 4
+rows a pair at 0.6 similarity shares a band ~88% of the time and one at 0.3
+only ~12%; candidates are then checked with the exact similarity.
+
+Indexing a whole course uses numpy when it is installed (about 15x
+faster); the app indexes questions one at a time as they are added or
+edited, which needs no numpy. Imports, sample questions and migrated
+legacy tables are indexed as they are inserted.
+
+Questions from before the index existed are indexed by the first
+duplicate report for their course, or all at once with:
+
+    python quiz_dedup.py index
+    python quiz_dedup.py report History --threshold 0.7
+"""
+import argparse
+import random
+import re
+import zlib
+
+import quiz_db
+
+NUM_HASHES = 64
+BANDS = 16
+ROWS = NUM_HASHES // BANDS
+THRESHOLD = 0.6
+MAX_BUCKET = 50         # bigger buckets are templated questions, not duplicates
+INDEX_BATCH = 10000     # questions per transaction; commits dominate indexing time
+SIGNATURE_CHUNK = 1000  # questions per numpy call, to bound its temporary arrays
+NUMPY_MIN_BATCH = 100   # smaller batches are faster in pure Python than importing numpy
+PRIME = (1 << 31) - 1   # small enough that a * x + b fits in 64 bits for numpy
+
+# Fixed seed: band keys are stored, so the hash functions must never change
+_rng = random.Random(20240611)
+_PERMUTATIONS = [(_rng.randrange(1, PRIME), _rng.randrange(PRIME)) for _ in range(NUM_HASHES)]
+_MIXERS = [_rng.randrange(1 << 64) | 1 for _ in range(ROWS + 1)]
+MASK = (1 << 64) - 1
+_numpy_state = None
+
+_WORD = re.compile(r"\w+")
+
+
+def _words(text):
+    return _WORD.findall(text.lower())
+
+
+def shingles(question_text, options):
+    """The shingle set compared between questions"""
+    words = _words(question_text)
+    tokens = set(words)
+    tokens.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    tokens.update("= " + " ".join(_words(option)) for option in options)
+    return tokens
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def _numpy():
+    """(numpy, a column, b column, band mixers) for batches, or None without numpy.
+
+    Imported on first use only: one question takes under a millisecond in
+    pure Python, less than importing numpy would.
+    """
+    global _numpy_state
+    if _numpy_state is None:
+        try:
+            import numpy
+        except ImportError:
+            _numpy_state = False
+        else:
+            _numpy_state = (numpy,
+                            numpy.array([a for a, _ in _PERMUTATIONS], dtype=numpy.uint64)[:, None],
+                            numpy.array([b for _, b in _PERMUTATIONS], dtype=numpy.uint64)[:, None],
+                            numpy.array(_MIXERS, dtype=numpy.uint64))
+    return _numpy_state or None
+
+
+def _token_hashes(tokens):
+    return [zlib.crc32(token.encode("utf-8")) & PRIME for token in tokens] or [0]
+
+
+def signature(tokens):
+    """MinHash signature of a shingle set"""
+    hashes = _token_hashes(tokens)
+    return [min((a * x + b) % PRIME for x in hashes) for a, b in _PERMUTATIONS]
+
+
+def _signed(key):
+    key &= MASK
+    return key - (1 << 64) if key >> 63 else key
+
+
+def band_keys(question_text, options):
+    """The BANDS index keys for a question, as signed 64-bit integers.
+
+    Each key mixes the band number and its ROWS signature values with
+    fixed random multipliers, modulo 2**64.
+    """
+    values = signature(shingles(question_text, options))
+    return [_signed(band * _MIXERS[ROWS] + sum(value * mixer for value, mixer in
+                                               zip(values[band * ROWS:(band + 1) * ROWS], _MIXERS)))
+            for band in range(BANDS)]
+
+
+def batch_band_keys(questions):
+    """band_keys() for many (question_text, options) pairs, vectorized with numpy if present"""
+    state = _numpy() if len(questions) >= NUMPY_MIN_BATCH else None
+    if state is None:
+        return [band_keys(question_text, options) for question_text, options in questions]
+    if len(questions) > SIGNATURE_CHUNK:
+        return [keys for start in range(0, len(questions), SIGNATURE_CHUNK)
+                for keys in batch_band_keys(questions[start:start + SIGNATURE_CHUNK])]
+    numpy, a, b, mixers = state
+
+    hashes = [_token_hashes(shingles(question_text, options))
+              for question_text, options in questions]
+    if not hashes:
+        return []
+    starts = numpy.cumsum([0] + [len(h) for h in hashes[:-1]])
+    flat = numpy.fromiter((x for h in hashes for x in h), dtype=numpy.uint64)
+    # One column per token, one row per hash function; min over each question's columns
+    values = numpy.minimum.reduceat((a * flat + b) % PRIME, starts, axis=1).T
+    # uint64 arithmetic wraps, which is the modulo 2**64 band_keys() applies
+    keys = (values.reshape(len(hashes), BANDS, ROWS) * mixers[:ROWS]).sum(axis=2, dtype=numpy.uint64)
+    keys += numpy.arange(BANDS, dtype=numpy.uint64) * mixers[ROWS]
+    return keys.view(numpy.int64).tolist()
+
+
+def find_duplicates(course, question_text, options, threshold=THRESHOLD, keys=None,
+                    exclude=None):
+    """Return (similarity, question_id, question_text) for likely duplicates, best first.
+
+    keys are band_keys() of the question if the caller already has them;
+    exclude is the question's own id when checking an edit.
+    """
+    if keys is None:
+        keys = band_keys(question_text, options)
+    tokens = shingles(question_text, options)
+    matches = []
+    for question_id, row in quiz_db.band_matches(course, keys, MAX_BUCKET).items():
+        if question_id == exclude:
+            continue
+        similarity = jaccard(tokens, shingles(row[0], row[1:5]))
+        if similarity >= threshold:
+            matches.append((similarity, question_id, row[0]))
+    matches.sort(key=lambda match: (-match[0], match[1]))
+    return matches
+
+
+def index_course(course, batch_size=INDEX_BATCH):
+    """Compute band keys for every question of a course that has none; returns how many"""
+    indexed = 0
+    after = 0
+    while True:
+        rows = quiz_db.unindexed_questions(course, after, batch_size)
+        if not rows:
+            return indexed
+        keys = batch_band_keys([(row[1], row[2:6]) for row in rows])
+        quiz_db.set_question_bands(course, [(row[0], row_keys) for row, row_keys in zip(rows, keys)])
+        indexed += len(rows)
+        after = rows[-1][0]
+
+
+def duplicate_report(course, threshold=THRESHOLD):
+    """Group a course's near-duplicate questions.
+
+    Returns a list of groups, largest first, each a list of
+    (question_id, question_text, correct_answer) rows in id order. A
+    question joins a group if it is a near duplicate of any member.
+    """
+    index_course(course)
+
+    pairs = set()
+    for ids in quiz_db.band_buckets(course, MAX_BUCKET):
+        ids.sort()
+        pairs.update((a, b) for i, a in enumerate(ids) for b in ids[i + 1:])
+
+    rows = quiz_db.get_questions_by_ids(sorted({question_id for pair in pairs
+                                                for question_id in pair}))
+    tokens = {question_id: shingles(row[1], row[2:6]) for question_id, row in rows.items()}
+
+    # Union-find over the confirmed pairs
+    parent = {}
+
+    def root(question_id):
+        while parent[question_id] != question_id:
+            parent[question_id] = parent[parent[question_id]]
+            question_id = parent[question_id]
+        return question_id
+
+    for a, b in pairs:
+        if a in tokens and b in tokens and jaccard(tokens[a], tokens[b]) >= threshold:
+            parent.setdefault(a, a)
+            parent.setdefault(b, b)
+            parent[root(b)] = root(a)
+
+    groups = {}
+    for question_id in parent:
+        groups.setdefault(root(question_id), []).append(question_id)
+    report = [[(question_id, rows[question_id][1], rows[question_id][6])
+               for question_id in sorted(members)] for members in groups.values()]
+    report.sort(key=lambda group: (-len(group), group[0][0]))
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find near-duplicate quiz questions")
+    parser.add_argument("--db", default=quiz_db.DB_PATH, help="database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    index = commands.add_parser("index", help="index questions that are not indexed yet")
+    index.add_argument("--course", action="append", help="course to index (default: all)")
+    report = commands.add_parser("report", help="list groups of near duplicates in a course")
+    report.add_argument("course")
+    report.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="minimum similarity, 0-1 (default %(default)s)")
+    args = parser.parse_args(argv)
+
+    quiz_db.set_database(args.db)
+    quiz_db.initialize_database(seed=False)
+    if args.command == "index":
+        for course in args.course or quiz_db.list_courses():
+            print(f"{course}: indexed {index_course(course)} questions", flush=True)
+        return
+
+    groups = duplicate_report(args.course, args.threshold)
+    for group in groups:
+        print(f"{len(group)} similar questions:")
+        for question_id, question_text, correct_answer in group:
+            print(f"  {question_id:>8}  {question_text}  [{correct_answer}]")
+    print(f"{len(groups)} groups, {sum(len(group) for group in groups)} questions")
+
+
+if __name__ == "__main__":
+    main()
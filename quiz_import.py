@@ -0,0 +1,204 @@
+"""Headless bulk import of question banks from CSV or JSONL files.
+
+Each record needs question_text, option1..option4 (or an "options" list in
+JSONL) and correct_answer as the 1-based number of the right option, plus a
+course unless --course is given. Rows are checked with the same rules as the
+add question form and written in batches, one transaction per batch.
+
+    python quiz_import.py bank.csv --course History --errors bad_rows.csv
+    python quiz_import.py new_courses.jsonl --create-courses
+
+Imported questions are indexed for near-duplicate detection as they are
+written, so the add form warns about copies of them straight away. With
+--find-duplicates the duplicate groups in the imported courses are listed
+afterwards.
+"""
+import argparse
+import csv
+import json
+import sys
+
+import quiz_db
+import quiz_dedup
+
+BATCH_SIZE = 5000
+
+
+class ImportResult:
+    """Running totals for an import"""
+
+    def __init__(self):
+        self.imported = 0
+        self.errors = 0
+        self.last_line = 0
+        self.courses = set()
+
+    def __repr__(self):
+        return f"ImportResult(imported={self.imported}, errors={self.errors})"
+
+
+def read_records(path, fmt=None):
+    """Yield (line_number, record) pairs from the file one at a time.
+
+    CSV records are dicts keyed by the header row; JSONL records are the raw
+    line text so that bad JSON is reported as an error row by to_row().
+    """
+    if fmt is None:
+        fmt = "jsonl" if path.lower().endswith((".jsonl", ".ndjson")) else "csv"
+    if fmt not in ("csv", "jsonl"):
+        raise ValueError(f"Unsupported format: {fmt}")
+
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, record
+        else:
+            for line_number, line in enumerate(f, start=1):
+                if line.strip():
+                    yield line_number, line
+
+
+def to_row(record, course=None):
+    """Turn one record into a questions row, raising ValueError if it is invalid"""
+    if isinstance(record, str):
+        try:
+            record = json.loads(record)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e}")
+        if not isinstance(record, dict):
+            raise ValueError("Expected a JSON object")
+
+    options = record.get("options")
+    if options is None:
+        options = [record.get(f"option{i}") for i in range(1, 5)]
+    elif not isinstance(options, list):
+        raise ValueError("options must be a list")
+    options = ["" if option is None else str(option) for option in options]
+
+    question_text, options, correct_answer = quiz_db.validate_question(
+        str(record.get("question_text") or ""),
+        options,
+        record.get("correct_answer") or "")
+
+    row_course = course or str(record.get("course") or "").strip()
+    if not row_course:
+        raise ValueError("Missing course")
+
+    return (row_course, question_text, *options, correct_answer)
+
+
+def import_questions(path, course=None, fmt=None, batch_size=BATCH_SIZE,
+                     progress=None, on_error=None, create_courses=False):
+    """Stream a question file into the database.
+
+    progress(result) is called after each committed batch and
+    on_error(line_number, message, record) for every rejected row. Only one
+    batch is held in memory at a time, whatever the size of the file.
+    Rows for unregistered courses are rejected unless create_courses is set,
+    in which case the courses are added.
+    """
+    known_courses = set(quiz_db.list_courses())
+
+    def require(name):
+        if name not in known_courses:
+            if not create_courses:
+                raise ValueError(f"Unknown course: {name}")
+            quiz_db.add_course(name)
+            known_courses.add(name)
+
+    if course is not None:
+        require(course)
+
+    result = ImportResult()
+    batch = []
+
+    def flush():
+        # Indexed for the duplicate check in the same transaction as the insert
+        quiz_db.add_questions(batch, bands=quiz_dedup.batch_band_keys(
+            [(row[1], row[2:6]) for row in batch]))
+        result.imported += len(batch)
+        result.courses.update(row[0] for row in batch)
+        batch.clear()
+        if progress:
+            progress(result)
+
+    for line_number, record in read_records(path, fmt):
+        result.last_line = line_number
+        try:
+            row = to_row(record, course)
+            require(row[0])
+        except ValueError as e:
+            result.errors += 1
+            if on_error:
+                on_error(line_number, str(e), record)
+            continue
+
+        batch.append(row)
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import quiz questions")
+    parser.add_argument("path", help="CSV or JSONL file to import")
+    parser.add_argument("--course", help="put every row in this course")
+    parser.add_argument("--format", choices=["csv", "jsonl"],
+                        help="file format (default: from the extension)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--errors", help="write rejected rows to this CSV file")
+    parser.add_argument("--db", default=quiz_db.DB_PATH, help="database file")
+    parser.add_argument("--create-courses", action="store_true",
+                        help="add courses that are not registered yet instead of rejecting their rows")
+    parser.add_argument("--find-duplicates", action="store_true",
+                        help="report near-duplicate questions in the imported courses")
+    args = parser.parse_args(argv)
+
+    quiz_db.set_database(args.db)
+    # No sample questions in a database that is about to be filled
+    quiz_db.initialize_database(seed=False)
+
+    error_file = open(args.errors, "w", newline="", encoding="utf-8") if args.errors else None
+    error_writer = csv.writer(error_file) if error_file else None
+    if error_writer:
+        error_writer.writerow(["line", "error", "record"])
+
+    def report_error(line_number, message, record):
+        if error_writer:
+            if isinstance(record, dict):
+                record = json.dumps(record)
+            error_writer.writerow([line_number, message, record.rstrip("\r\n")])
+        else:
+            print(f"line {line_number}: {message}", file=sys.stderr)
+
+    def report_progress(result):
+        print(f"\rimported {result.imported} rows, {result.errors} errors "
+              f"(line {result.last_line})", end="", file=sys.stderr, flush=True)
+
+    try:
+        result = import_questions(args.path, course=args.course, fmt=args.format,
+                                  batch_size=args.batch_size,
+                                  progress=report_progress, on_error=report_error,
+                                  create_courses=args.create_courses)
+    finally:
+        if error_file:
+            error_file.close()
+
+    print(f"\rimported {result.imported} rows, {result.errors} errors", file=sys.stderr)
+    if args.find_duplicates:
+        for course in sorted(result.courses):
+            groups = quiz_dedup.duplicate_report(course)
+            print(f"{course}: {len(groups)} groups of near duplicates, "
+                  f"{sum(len(group) for group in groups)} questions", file=sys.stderr)
+            for group in groups:
+                print(f"  ids {', '.join(str(row[0]) for row in group)}: {group[0][1]}",
+                      file=sys.stderr)
+    return 1 if result.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
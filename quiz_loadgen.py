@@ -0,0 +1,160 @@
+"""Local load generator for quiz_server.py.
+
+Runs N simulated quiz takers concurrently, each on its own keep-alive
+connection: list courses, start a quiz, fetch and answer every question,
+then read the results. Prints completed sessions, request throughput and
+latency percentiles.
+
+    python quiz_loadgen.py --takers 2000 --questions 10
+    python quiz_loadgen.py --takers 2000 --spawn-server   # start a server in-process
+
+The spawned server logs every answer, which also recalibrates question
+difficulty, so it runs on a temporary copy of --db unless --in-place is
+given.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import quiz_db
+
+
+class Client:
+    """Minimal HTTP/1.1 JSON client over one keep-alive connection"""
+
+    def __init__(self, host, port, latencies):
+        self.host = host
+        self.port = port
+        self.latencies = latencies
+        self.reader = None
+        self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method, path, body=None):
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n")
+        start = time.perf_counter()
+        self.writer.write(head.encode("latin-1") + data)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        payload = json.loads(await self.reader.readexactly(length))
+        self.latencies.append(time.perf_counter() - start)
+        if status >= 400:
+            raise RuntimeError(f"{method} {path} -> {status}: {payload.get('error')}")
+        return payload
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+
+
+async def take_quiz(host, port, count, latencies, rng):
+    """One simulated taker; answers are chosen at random"""
+    client = Client(host, port, latencies)
+    await client.connect()
+    try:
+        courses = (await client.request("GET", "/courses"))["courses"]
+        session = await client.request("POST", "/sessions",
+                                       {"course": rng.choice(courses), "count": count})
+        base = f"/sessions/{session['session_id']}"
+        while True:
+            state = await client.request("GET", f"{base}/question")
+            if state["finished"]:
+                break
+            answer = rng.choice(state["question"]["options"])
+            await client.request("POST", f"{base}/answer", {"answer": answer})
+        return await client.request("GET", f"{base}/results")
+    finally:
+        client.close()
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def run_load(host, port, takers, count, seed=0):
+    """Run takers concurrently and return a summary dict"""
+    latencies = []
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(
+        *(take_quiz(host, port, count, latencies, random.Random(rng.random()))
+          for _ in range(takers)),
+        return_exceptions=True)
+    elapsed = time.perf_counter() - start
+
+    errors = [o for o in outcomes if isinstance(o, BaseException)]
+    return {
+        "takers": takers,
+        "completed": takers - len(errors),
+        "errors": len(errors),
+        "first_error": repr(errors[0]) if errors else None,
+        "seconds": elapsed,
+        "requests": len(latencies),
+        "requests_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000
+    }
+
+
+async def run_with_server(host, port, takers, count):
+    """Start a QuizServer in this process, load it, then stop it"""
+    from quiz_server import QuizServer
+
+    listening = asyncio.Event()
+    server_task = asyncio.create_task(
+        QuizServer().serve(host, port, ready=lambda server: listening.set()))
+    await listening.wait()
+    try:
+        return await run_load(host, port, takers, count)
+    finally:
+        server_task.cancel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test quiz_server.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--takers", type=int, default=1000, help="concurrent quiz takers")
+    parser.add_argument("--questions", type=int, default=10, help="questions per quiz")
+    parser.add_argument("--spawn-server", action="store_true",
+                        help="run the server in this process")
+    parser.add_argument("--db", default=quiz_db.DB_PATH, help="database file for --spawn-server")
+    parser.add_argument("--in-place", action="store_true",
+                        help="let --spawn-server write to --db itself instead of a temporary copy")
+    args = parser.parse_args(argv)
+
+    if args.spawn_server:
+        db_path = args.db if args.in_place else quiz_db.copy_database(args.db)
+        quiz_db.set_database(db_path)
+        try:
+            summary = asyncio.run(run_with_server(args.host, args.port, args.takers,
+                                                  args.questions))
+        finally:
+            quiz_db.get_pool().close()
+            if not args.in_place:
+                quiz_db.remove_database(db_path)
+    else:
+        summary = asyncio.run(run_load(args.host, args.port, args.takers, args.questions))
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
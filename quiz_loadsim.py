@@ -0,0 +1,226 @@
+"""Multi-process load simulator for one quiz database file.
+
+Where quiz_loadgen.py tests the HTTP server, this goes straight at SQLite
+the way many copies of the desktop app sharing one quiz_bowl.db would.
+Each worker process runs whole quizzes with the same calls as the GUI
+(start_quiz's load_quiz, then submit_answer plus the attempts log for every
+answer) and, on a share of its turns, an admin write like the add and edit
+forms. Concurrency is stepped through the given process counts, and each
+level reports throughput, p50/p99 latency per operation and how often
+calls failed with "database is locked".
+
+The database is copied to a temporary file first (--in-place skips that),
+so the admin writes never touch the real question bank.
+
+    python quiz_loadsim.py --processes 1,2,4,8,16 --duration 10
+"""
+import argparse
+import json
+import multiprocessing
+import random
+import sqlite3
+import time
+
+import quiz_db
+from quiz_attempts import AttemptLog
+from quiz_loadgen import percentile
+from quiz_session import QuizSession
+
+OPERATIONS = ("start_quiz", "answer", "save_attempts", "submit_question", "update_question")
+QUIZ_LENGTH = 10
+WRITE_SHARE = 0.1       # fraction of turns that are admin writes instead of quizzes
+CORRECT_RATE = 0.6
+
+
+class WorkerStats:
+    """Latencies and failures of one worker, by operation"""
+
+    def __init__(self):
+        self.latencies = {op: [] for op in OPERATIONS}
+        self.locked = {op: 0 for op in OPERATIONS}
+        self.failed = {op: 0 for op in OPERATIONS}
+        self.quizzes = 0
+        self.first_error = None
+
+    def timed(self, op, fn, *args):
+        """Run fn, recording its latency; returns (ok, result)"""
+        start = time.perf_counter()
+        try:
+            result = fn(*args)
+        except sqlite3.OperationalError as e:
+            if "locked" in str(e) or "busy" in str(e):
+                self.locked[op] += 1
+            else:
+                self.failed[op] += 1
+                self.first_error = self.first_error or repr(e)
+            return False, None
+        except Exception as e:
+            self.failed[op] += 1
+            self.first_error = self.first_error or repr(e)
+            return False, None
+        self.latencies[op].append(time.perf_counter() - start)
+        return True, result
+
+
+def load_quiz(course, count):
+    """Same work as QuizBowlApp.load_quiz"""
+    session = QuizSession.start(course, count)
+    session.current_question()
+    return session
+
+
+def answer(session, log, rng):
+    """Same work as QuizBowlApp.check_quiz_answer plus showing the next question"""
+    question = session.current_question()
+    choice = (question.correct_answer if rng.random() < CORRECT_RATE
+              else rng.choice(question.options))
+    is_correct, _ = session.submit_answer(choice)
+    log.record(session, is_correct)
+    session.current_question()
+
+
+def submit_question(course, worker, n):
+    """Same work as QuizBowlApp.submit_question"""
+    question_text, options, correct_answer = quiz_db.validate_question(
+        f"Load test question {worker}-{n}", [f"Option {i}" for i in range(1, 5)], "2")
+    return quiz_db.add_question(course, question_text, options, correct_answer)
+
+
+def update_question(course, question_id, n):
+    """Same work as opening the edit form and saving it"""
+    row = quiz_db.get_question(course, question_id)
+    if row is None:
+        return
+    question_text, options, correct_answer = quiz_db.validate_question(
+        f"{row[0].split(' [edit')[0]} [edit {n}]", row[1:5], str(row[1:5].index(row[5]) + 1))
+    quiz_db.update_question(course, question_id, question_text, options, correct_answer)
+
+
+def run_worker(job):
+    """One simulated machine: quizzes and admin writes until the deadline"""
+    worker, db_path, course, targets, start_at, duration, busy_timeout, seed = job
+    quiz_db.BUSY_TIMEOUT = busy_timeout
+    quiz_db.set_database(db_path)
+    rng = random.Random(seed)
+    stats = WorkerStats()
+    log = AttemptLog()
+    writes = 0
+
+    time.sleep(max(0.0, start_at - time.time()))
+    deadline = start_at + duration
+    while time.time() < deadline:
+        if rng.random() < WRITE_SHARE:
+            writes += 1
+            if writes % 2:
+                stats.timed("submit_question", submit_question, course, worker, writes)
+            elif targets:
+                stats.timed("update_question", update_question, course,
+                            rng.choice(targets), writes)
+            continue
+
+        ok, session = stats.timed("start_quiz", load_quiz, course, QUIZ_LENGTH)
+        if not ok or not session.total:
+            continue
+        while not session.finished and time.time() < deadline:
+            ok, _ = stats.timed("answer", answer, session, log, rng)
+            if not ok:
+                break
+        if session.finished:
+            # The GUI writes the attempts log when a quiz ends
+            if stats.timed("save_attempts", log.flush)[0]:
+                stats.quizzes += 1
+    return stats
+
+
+def run_level(processes, db_path, course, targets, duration, busy_timeout):
+    """Run processes workers at once and merge their stats into a summary dict"""
+    start_at = time.time() + 0.5 + 0.05 * processes
+    jobs = [(i, db_path, course, targets, start_at, duration, busy_timeout, i * 7919)
+            for i in range(processes)]
+    with multiprocessing.Pool(processes) as pool:
+        results = pool.map(run_worker, jobs)
+
+    summary = {"processes": processes, "quizzes": sum(r.quizzes for r in results),
+               "operations": {}, "first_error": next(
+                   (r.first_error for r in results if r.first_error), None)}
+    total_ok = total_locked = total_failed = 0
+    for op in OPERATIONS:
+        latencies = [t for r in results for t in r.latencies[op]]
+        locked = sum(r.locked[op] for r in results)
+        failed = sum(r.failed[op] for r in results)
+        attempts = len(latencies) + locked + failed
+        total_ok += len(latencies)
+        total_locked += locked
+        total_failed += failed
+        summary["operations"][op] = {
+            "count": len(latencies),
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+            "locked": locked,
+            "failed": failed,
+            "locked_rate": locked / attempts if attempts else 0.0
+        }
+    attempts = total_ok + total_locked + total_failed
+    summary["operations_per_second"] = total_ok / duration
+    summary["quizzes_per_second"] = summary["quizzes"] / duration
+    summary["locked_rate"] = total_locked / attempts if attempts else 0.0
+    summary["failed"] = total_failed
+    return summary
+
+
+def print_level(summary):
+    ops = summary["operations"]
+    print(f"{summary['processes']:>5} {summary['operations_per_second']:>8.0f} "
+          f"{summary['quizzes_per_second']:>8.1f} "
+          f"{ops['answer']['p50_ms']:>7.2f} {ops['answer']['p99_ms']:>8.2f} "
+          f"{ops['save_attempts']['p99_ms']:>8.2f} "
+          f"{max(ops['submit_question']['p99_ms'], ops['update_question']['p99_ms']):>8.2f} "
+          f"{summary['locked_rate']:>7.2%} {summary['failed']:>6}", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate many app instances sharing one database")
+    parser.add_argument("--db", default=quiz_db.DB_PATH, help="database file to test")
+    parser.add_argument("--course", help="course to take quizzes from (default: the first)")
+    parser.add_argument("--processes", default="1,2,4,8",
+                        help="comma-separated worker counts to step through")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per level")
+    parser.add_argument("--busy-timeout", type=float, default=quiz_db.BUSY_TIMEOUT,
+                        help="seconds SQLite waits for a lock before failing")
+    parser.add_argument("--in-place", action="store_true",
+                        help="write to --db itself instead of a temporary copy")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    quiz_db.set_database(args.db)
+    quiz_db.initialize_database()
+    course = args.course or quiz_db.list_courses()[0]
+    # Questions the admin edits are drawn from these
+    targets = quiz_db.list_question_ids(course, 1000)
+    quiz_db.get_pool().close()
+    db_path = args.db if args.in_place else quiz_db.copy_database(args.db)
+
+    print(f"Course {course}, {args.duration:g} s per level, busy timeout {args.busy_timeout:g} s")
+    print(" proc    ops/s  quiz/s  ans p50  ans p99  save p99 write p99  locked  errors")
+    levels = []
+    try:
+        for processes in [int(p) for p in args.processes.split(",") if p.strip()]:
+            summary = run_level(processes, db_path, course, targets, args.duration,
+                                args.busy_timeout)
+            levels.append(summary)
+            print_level(summary)
+    finally:
+        if not args.in_place:
+            quiz_db.remove_database(db_path)
+
+    first_error = next((level["first_error"] for level in levels if level["first_error"]), None)
+    if first_error:
+        print(f"First non-lock error: {first_error}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"course": course, "db": args.db, "duration": args.duration,
+                       "busy_timeout": args.busy_timeout, "levels": levels}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""Read-only compiled question packs, loaded with mmap.
+
+A pack is the QuestionBank layout (see question_bank.py) written to one
+file, so a quiz machine can start quizzes without opening quiz_bowl.db for
+reading questions at all:
+
+    header      magic, format version, course and question counts, and the
+                file offset of every section below
+    courses     per course: index of its first question, question count and
+                name; each course's questions are contiguous and sorted by id
+    ids         array('q'), one entry per question
+    offsets     array('Q') of string boundaries into text, five strings per
+                question, so question i spans offsets[5*i] .. offsets[5*i+5]
+    correct     array('b') holding the 0-3 index of the right option
+    text        the UTF-8 question text and four options of every question
+
+Opening a pack maps the file and casts memoryviews over those sections;
+nothing is parsed or copied except the small course table. Indexing returns
+question_bank.QuestionView objects, which decode only the strings they are
+asked for, so a quiz touches a few pages of the file and the rest stays on
+disk (or in the OS page cache, shared by every process that maps it).
+
+    python quiz_pack.py build quiz_bowl.qpak                  # every course
+    python quiz_pack.py build history.qpak --course History
+    python quiz_pack.py info quiz_bowl.qpak
+
+The GUI takes quizzes from a pack when QUIZ_PACK names one. Answers are
+still saved to the database, and adaptive quizzes still read it, since they
+need difficulties that change as people answer.
+"""
+import argparse
+import bisect
+import mmap
+import os
+import random
+import shutil
+import struct
+import tempfile
+from array import array
+
+import quiz_db
+from question_bank import FIELDS_PER_QUESTION, QuestionView
+
+MAGIC = b"QPAK"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sIIQQQQQ")     # magic, version, courses, questions, 4 section offsets
+COURSE_ENTRY = struct.Struct("<QQI")     # first question, question count, name length
+ALIGNMENT = 8
+ENV_VAR = "QUIZ_PACK"
+
+
+class PackError(Exception):
+    """Raised for a file that is not a readable question pack"""
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def build_pack(path, courses=None):
+    """Compile courses (default: all) from the database into a pack at path.
+
+    Question text is streamed to a scratch file, so only the id, offset and
+    answer columns are held in memory. The pack is written next to path and
+    renamed over it, so processes that have the old pack open keep reading
+    a consistent file. Questions whose correct answer is not one of their
+    options cannot be graded from a pack and are skipped.
+
+    Returns (questions written, questions skipped).
+    """
+    courses = list(courses) if courses else quiz_db.list_courses()
+    ids = array("q")
+    offsets = array("Q", [0])
+    correct = array("b")
+    table = []
+    skipped = 0
+    folder = os.path.dirname(os.path.abspath(path))
+
+    with tempfile.TemporaryFile(dir=folder) as text:
+        size = 0
+        for course in courses:
+            first = len(ids)
+            for row in quiz_db.iter_questions(course):
+                options = list(row[2:6])
+                if row[6] not in options:
+                    skipped += 1
+                    continue
+                for value in (row[1], *options):
+                    data = value.encode("utf-8")
+                    text.write(data)
+                    size += len(data)
+                    offsets.append(size)
+                ids.append(row[0])
+                correct.append(options.index(row[6]))
+            table.append((course, first, len(ids) - first))
+
+        course_bytes = b"".join(COURSE_ENTRY.pack(first, count, len(name.encode("utf-8")))
+                                + name.encode("utf-8") for name, first, count in table)
+        ids_at = _align(HEADER.size + len(course_bytes))
+        offsets_at = ids_at + len(ids) * ids.itemsize
+        correct_at = offsets_at + len(offsets) * offsets.itemsize
+        text_at = _align(correct_at + len(correct))
+
+        handle, scratch = tempfile.mkstemp(dir=folder, suffix=".qpak-tmp")
+        try:
+            with os.fdopen(handle, "wb") as out:
+                out.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(table), len(ids),
+                                      ids_at, offsets_at, correct_at, text_at))
+                out.write(course_bytes)
+                out.write(b"\0" * (ids_at - out.tell()))
+                ids.tofile(out)
+                offsets.tofile(out)
+                correct.tofile(out)
+                out.write(b"\0" * (text_at - out.tell()))
+                text.seek(0)
+                shutil.copyfileobj(text, out)
+            # mkstemp makes the file private; a pack is meant to be shared
+            os.chmod(scratch, 0o644)
+            os.replace(scratch, path)
+        except Exception:
+            os.remove(scratch)
+            raise
+    return len(ids), skipped
+
+
+class QuestionPack:
+    """A memory-mapped pack; indexing it gives QuestionView objects"""
+
+    def __init__(self, path):
+        self.path = path
+        self._views = ()
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._open()
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self):
+        view = memoryview(self._map)
+        self._views = (view,)
+        if len(view) < HEADER.size:
+            raise PackError(f"{self.path} is not a question pack")
+        (magic, version, course_count, count,
+         ids_at, offsets_at, correct_at, text_at) = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise PackError(f"{self.path} is not a question pack")
+        if version != FORMAT_VERSION:
+            raise PackError(f"{self.path} is pack format {version}, expected {FORMAT_VERSION}")
+
+        self.courses = {}
+        position = HEADER.size
+        for _ in range(course_count):
+            first, size, name_length = COURSE_ENTRY.unpack_from(view, position)
+            position += COURSE_ENTRY.size
+            name = str(view[position:position + name_length], "utf-8")
+            position += name_length
+            self.courses[name] = (first, size)
+
+        if (text_at > len(view) or offsets_at - ids_at != count * 8
+                or correct_at - offsets_at != (count * FIELDS_PER_QUESTION + 1) * 8):
+            raise PackError(f"{self.path} is truncated or damaged")
+
+        # The attribute names match QuestionBank so QuestionView works on both
+        self._ids = view[ids_at:offsets_at].cast("q")
+        self._offsets = view[offsets_at:correct_at].cast("Q")
+        self._correct = view[correct_at:correct_at + count].cast("b")
+        self._text = view[text_at:]
+        self._views = (view, self._ids, self._offsets, self._correct, self._text)
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = ()
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self._ids)
+        if index < 0 or index >= len(self._ids):
+            raise IndexError("question pack index out of range")
+        return QuestionView(self, index)
+
+    def _field(self, index, field):
+        start = index * FIELDS_PER_QUESTION + field
+        return str(self._text[self._offsets[start]:self._offsets[start + 1]], "utf-8")
+
+    def list_courses(self):
+        return list(self.courses)
+
+    def _course(self, course):
+        if course not in self.courses:
+            raise LookupError(f"Course {course} is not in the question pack")
+        first, size = self.courses[course]
+        return first, first + size
+
+    def index_of(self, course, question_id):
+        """Position of a question in the pack, or None if it is not there"""
+        low, high = self._course(course)
+        index = bisect.bisect_left(self._ids, question_id, low, high)
+        return index if index < high and self._ids[index] == question_id else None
+
+    def list_question_ids(self, course):
+        low, high = self._course(course)
+        return self._ids[low:high].tolist()
+
+    def sample_question_ids(self, course, count, stratified=False, rng=random):
+        """Same contract as quiz_sampling.sample_question_ids, without any I/O"""
+        low, high = self._course(course)
+        if count <= 0:
+            return []
+        if high - low <= count:
+            ids = self._ids[low:high].tolist()
+            rng.shuffle(ids)
+            return ids
+        if stratified:
+            width = (high - low) / count
+            indices = [low + int((i + rng.random()) * width) for i in range(count)]
+        else:
+            indices = rng.sample(range(low, high), count)
+        return [self._ids[i] for i in indices]
+
+    def quiz(self, course, question_ids):
+        """The questions for these ids, in order"""
+        return PackQuiz(self, course, question_ids)
+
+
+class PackQuiz:
+    """Sequence of QuestionViews for a quiz taken from a pack"""
+
+    def __init__(self, pack, course, question_ids):
+        self.pack = pack
+        self.course = course
+        self.question_ids = list(question_ids)
+
+    def __len__(self):
+        return len(self.question_ids)
+
+    def __getitem__(self, index):
+        question_id = self.question_ids[index]
+        position = self.pack.index_of(self.course, question_id)
+        if position is None:
+            raise LookupError(f"Question {question_id} is not in the question pack")
+        return QuestionView(self.pack, position)
+
+
+def open_from_env():
+    """Open the pack named by QUIZ_PACK, or return None if it is not set"""
+    path = os.environ.get(ENV_VAR)
+    return QuestionPack(path) if path else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile or inspect read-only question packs")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="compile the database into a pack")
+    build.add_argument("pack", help="pack file to write")
+    build.add_argument("--course", action="append",
+                       help="course to include (repeatable, default: all)")
+    build.add_argument("--db", default=quiz_db.DB_PATH, help="database to read")
+    info = commands.add_parser("info", help="list the courses in a pack")
+    info.add_argument("pack")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        quiz_db.set_database(args.db)
+        written, skipped = build_pack(args.pack, args.course)
+        print(f"Wrote {written} questions to {args.pack} ({os.path.getsize(args.pack)} bytes)")
+        if skipped:
+            print(f"Skipped {skipped} questions whose correct answer is not one of their options")
+    else:
+        with QuestionPack(args.pack) as pack:
+            for course, (first, size) in pack.courses.items():
+                print(f"{course:<30} {size:>10} questions")
+            print(f"{'Total':<30} {len(pack):>10} questions")
+
+
+if __name__ == "__main__":
+    main()
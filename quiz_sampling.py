@@ -0,0 +1,97 @@
+"""Random question sampling and lazily loaded quizzes.
+
+Sampling draws random points in a course's id range and seeks the index to
+the next existing id, so picking N questions costs N index lookups no
+matter how large the course is. Ids that follow a gap are a little more
+likely to be drawn than others; for quiz use that bias is harmless.
+"""
+import random
+
+import quiz_db
+from question import Question
+
+# Rejection draws allowed per requested question before falling back to
+# ORDER BY random(), which only happens when asking for most of a course.
+MAX_DRAWS_PER_QUESTION = 8
+
+# Questions fetched per round trip while the taker moves through a quiz
+PREFETCH = 5
+
+
+def sample_question_ids(course, count, stratified=False, rng=random):
+    """Return up to count distinct random question ids from a course.
+
+    With stratified=True the id range is split into count equal slices and
+    one question is drawn from each, spreading the quiz over the whole bank
+    (for example across several imports) instead of leaving it to chance.
+    """
+    if count <= 0:
+        return []
+
+    # A course no bigger than the request is served whole, in random order
+    head = quiz_db.list_question_ids(course, limit=count + 1)
+    if len(head) <= count:
+        rng.shuffle(head)
+        return head
+
+    low, high = quiz_db.question_id_range(course)
+    span = high - low + 1
+    chosen = []
+    seen = set()
+
+    def take(ids):
+        for question_id in ids:
+            if question_id is not None and question_id not in seen and len(chosen) < count:
+                seen.add(question_id)
+                chosen.append(question_id)
+
+    if stratified:
+        width = span / count
+        take(quiz_db.seek_question_ids(
+            course, [low + int((i + rng.random()) * width) for i in range(count)]))
+
+    draws = 0
+    while len(chosen) < count and draws < count * MAX_DRAWS_PER_QUESTION:
+        needed = count - len(chosen)
+        take(quiz_db.seek_question_ids(
+            course, [low + rng.randrange(span) for _ in range(needed)]))
+        draws += needed
+
+    if len(chosen) < count:
+        take(quiz_db.random_question_ids(course, count * 2))
+
+    if not stratified:
+        rng.shuffle(chosen)
+    return chosen
+
+
+class LazyQuiz:
+    """Sequence of Question objects loaded from the database on first access"""
+
+    def __init__(self, question_ids, prefetch=PREFETCH):
+        self.question_ids = list(question_ids)
+        self.prefetch = prefetch
+        self._loaded = {}
+
+    def __len__(self):
+        return len(self.question_ids)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.question_ids)
+        if index < 0 or index >= len(self.question_ids):
+            raise IndexError("quiz index out of range")
+
+        if index not in self._loaded:
+            # Drop questions the taker has moved past and load the next few
+            self._loaded = {i: q for i, q in self._loaded.items() if i >= index}
+            wanted = range(index, min(index + self.prefetch, len(self.question_ids)))
+            rows = quiz_db.get_questions_by_ids([self.question_ids[i] for i in wanted])
+            for i in wanted:
+                row = rows.get(self.question_ids[i])
+                if row is not None:
+                    self._loaded[i] = Question(row[0], row[1], list(row[2:6]), row[6])
+
+        if index not in self._loaded:
+            raise LookupError(f"Question {self.question_ids[index]} no longer exists")
+        return self._loaded[index]
@@ -0,0 +1,265 @@
+"""Asyncio HTTP/JSON server for taking quizzes from many machines at once.
+
+The endpoints follow the quiz screens of the desktop app:
+
+    GET  /courses                    category selection
+    POST /sessions                   start a quiz: {"course", "count", "stratified", "adaptive"}
+    GET  /sessions/<id>/question     current question (without its answer)
+    POST /sessions/<id>/answer       submit {"answer": "<option text>"}
+    GET  /sessions/<id>/results      final score and feedback
+
+Every call that can touch SQLite runs on a thread pool sized to the
+connection pool, so the event loop only parses requests and writes
+responses. Sessions are QuizSession objects kept in memory and dropped
+after SESSION_TTL seconds without a request. Answers go to an AttemptLog
+and are written in batches from the same pool.
+
+    python quiz_server.py --port 8080
+"""
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import quiz_db
+from quiz_attempts import AttemptLog
+from quiz_session import AdaptiveQuizSession, QuizSession
+
+SESSION_TTL = 30 * 60
+SWEEP_INTERVAL = 60
+MAX_BODY = 64 * 1024
+
+REASONS = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error"
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class QuizServer:
+    """Routes quiz requests to in-memory sessions"""
+
+    def __init__(self, workers=quiz_db.POOL_SIZE):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="quiz-db")
+        self.sessions = {}
+        self.attempts = AttemptLog()
+        self._locks = {}
+        self._last_seen = {}
+
+    async def run_db(self, fn, *args):
+        """Run a blocking database call on the worker pool"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    def _session(self, session_id):
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise HTTPError(404, "Unknown or expired session")
+        self._last_seen[session_id] = time.monotonic()
+        return session, self._locks[session_id]
+
+    def sweep(self):
+        """Forget sessions that have been idle for longer than SESSION_TTL"""
+        cutoff = time.monotonic() - SESSION_TTL
+        for session_id in [s for s, seen in self._last_seen.items() if seen < cutoff]:
+            del self.sessions[session_id]
+            del self._locks[session_id]
+            del self._last_seen[session_id]
+            self.attempts.discard(session_id)
+
+    def _answer(self, session, answer):
+        """Submit an answer and log it (runs on the worker pool)"""
+        is_correct, correct_answer = session.submit_answer(answer)
+        if self.attempts.record(session, is_correct):
+            self.attempts.flush()
+        return is_correct, correct_answer
+
+    async def _sweeper(self):
+        while True:
+            await asyncio.sleep(SWEEP_INTERVAL)
+            self.sweep()
+            await self.run_db(self.attempts.flush)
+
+    # Endpoints
+
+    async def list_courses(self):
+        return 200, {"courses": await self.run_db(quiz_db.list_courses)}
+
+    async def create_session(self, body):
+        course = body.get("course")
+        if not course:
+            raise HTTPError(400, "course is required")
+        count = body.get("count")
+        if count is not None and (not isinstance(count, int) or count <= 0):
+            raise HTTPError(400, "count must be a positive integer")
+
+        session_class = AdaptiveQuizSession if body.get("adaptive") else QuizSession
+        session = await self.run_db(session_class.start, course, count,
+                                    bool(body.get("stratified")))
+        # Picks an adaptive quiz's first question; an empty course leaves total at 0
+        await self.run_db(session.current_question)
+        if not session.total:
+            raise HTTPError(404, "No questions found for this course")
+
+        self.sessions[session.session_id] = session
+        self._locks[session.session_id] = asyncio.Lock()
+        self._last_seen[session.session_id] = time.monotonic()
+        return 201, {"session_id": session.session_id, "total": session.total}
+
+    async def get_question(self, session_id):
+        session, lock = self._session(session_id)
+        async with lock:
+            question = await self.run_db(session.current_question)
+        payload = {"position": session.position, "total": session.total,
+                   "score": session.score, "finished": question is None}
+        if question is not None:
+            payload["question"] = {"id": question.question_id, "text": question.question_text,
+                                   "options": question.options}
+        return 200, payload
+
+    async def submit_answer(self, session_id, body):
+        session, lock = self._session(session_id)
+        async with lock:
+            try:
+                is_correct, correct_answer = await self.run_db(
+                    self._answer, session, body.get("answer"))
+            except ValueError as e:
+                raise HTTPError(400, str(e))
+        return 200, {"correct": is_correct, "correct_answer": correct_answer,
+                     "score": session.score, "finished": session.finished}
+
+    async def get_results(self, session_id):
+        session, _ = self._session(session_id)
+        if not session.finished:
+            raise HTTPError(400, "The quiz is not finished yet")
+        return 200, session.results()
+
+    async def dispatch(self, method, path, body):
+        parts = [part for part in path.split("?", 1)[0].split("/") if part]
+
+        if parts == ["courses"]:
+            if method == "GET":
+                return await self.list_courses()
+        elif parts == ["sessions"]:
+            if method == "POST":
+                return await self.create_session(body)
+        elif len(parts) == 3 and parts[0] == "sessions":
+            session_id, action = parts[1], parts[2]
+            if action == "question" and method == "GET":
+                return await self.get_question(session_id)
+            if action == "answer" and method == "POST":
+                return await self.submit_answer(session_id, body)
+            if action == "results" and method == "GET":
+                return await self.get_results(session_id)
+            if action not in ("question", "answer", "results"):
+                raise HTTPError(404, "Not found")
+        else:
+            raise HTTPError(404, "Not found")
+        raise HTTPError(405, "Method not allowed")
+
+    # HTTP plumbing
+
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one keep-alive connection"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, version = request_line.decode("latin-1").split()
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version == "HTTP/1.1")
+                status, payload = await self.respond(method, path, headers, reader)
+
+                data = json.dumps(payload).encode("utf-8")
+                head = (f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                        f"Content-Type: application/json\r\n"
+                        f"Content-Length: {len(data)}\r\n")
+                if not keep_alive:
+                    head += "Connection: close\r\n"
+                writer.write(head.encode("latin-1") + b"\r\n" + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, method, path, headers, reader):
+        """Read the request body and run the endpoint, mapping errors to JSON"""
+        try:
+            length = int(headers.get("content-length") or 0)
+            if length > MAX_BODY:
+                raise HTTPError(413, "Request body too large")
+            body = {}
+            if length:
+                try:
+                    body = json.loads(await reader.readexactly(length))
+                except json.JSONDecodeError:
+                    raise HTTPError(400, "Body must be JSON")
+                if not isinstance(body, dict):
+                    raise HTTPError(400, "Body must be a JSON object")
+            return await self.dispatch(method, path, body)
+        except HTTPError as e:
+            return e.status, {"error": str(e)}
+        except (asyncio.IncompleteReadError, ConnectionError):
+            raise
+        except Exception as e:
+            return 500, {"error": str(e)}
+
+    async def serve(self, host, port, ready=None):
+        """Run until cancelled; ready(server) is called once listening"""
+        await self.run_db(quiz_db.initialize_database)
+        server = await asyncio.start_server(self.handle_connection, host, port, backlog=4096)
+        sweeper = asyncio.create_task(self._sweeper())
+        if ready:
+            ready(server)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            sweeper.cancel()
+            self.executor.shutdown(wait=True)
+            self.attempts.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve quizzes over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--db", default=quiz_db.DB_PATH, help="database file")
+    args = parser.parse_args(argv)
+
+    quiz_db.set_database(args.db)
+
+    def ready(server):
+        print(f"Serving quizzes on http://{args.host}:{args.port}")
+
+    try:
+        asyncio.run(QuizServer().serve(args.host, args.port, ready))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
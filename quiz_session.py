@@ -0,0 +1,248 @@
+"""Quiz-taking engine with no GUI dependency.
+
+A QuizSession holds everything about one person's quiz: the course, the
+chosen question ids, the current position, the score and the option index
+picked for every answered question. Any number of sessions can exist side
+by side, and to_state()/from_state() turn one into a small dict of plain
+values (ids and counters only, never question text) for storage or
+transport.
+
+AdaptiveQuizSession picks each question as it is reached: the unseen one
+whose calibrated difficulty is nearest the taker's current ability
+estimate, which is re-estimated after every answer.
+"""
+import json
+import math
+import os
+import random
+
+import quiz_db
+from question import Question
+from quiz_sampling import LazyQuiz, sample_question_ids
+
+NO_OPTION = -1  # recorded when an answer matches none of the options
+ADAPTIVE_LENGTH = 20
+NEWTON_STEPS = 10
+
+
+def feedback_for(percentage):
+    """Feedback message shown with a final score"""
+    if percentage >= 80:
+        return "Excellent work!"
+    elif percentage >= 60:
+        return "Good job!"
+    else:
+        return "Keep practicing!"
+
+
+class QuizSession:
+    """One quiz taker's progress through a quiz"""
+
+    def __init__(self, course, question_ids, session_id=None, position=0, score=0,
+                 responses=None, source=None):
+        # 128 random bits, like uuid4().hex without importing uuid
+        self.session_id = session_id or os.urandom(16).hex()
+        self.course = course
+        self.question_ids = list(question_ids)
+        self.position = position
+        self.score = score
+        self.responses = list(responses) if responses is not None else []
+        self.source = source
+        self._questions = None
+
+    @classmethod
+    def start(cls, course, count=None, stratified=False, source=None):
+        """Begin a quiz of count sampled questions, or the whole course in order.
+
+        source, a quiz_pack.QuestionPack or quiz_cache.CourseCache, supplies
+        the questions instead of the database.
+        """
+        if source is not None:
+            question_ids = (source.list_question_ids(course) if count is None
+                            else source.sample_question_ids(course, count, stratified=stratified))
+        elif count is None:
+            question_ids = quiz_db.list_question_ids(course)
+        else:
+            question_ids = sample_question_ids(course, count, stratified=stratified)
+        return cls(course, question_ids, source=source)
+
+    @property
+    def questions(self):
+        """The quiz's Question objects, loaded as they are reached"""
+        if self._questions is None:
+            if self.source is not None:
+                self._questions = self.source.quiz(self.course, self.question_ids)
+            else:
+                self._questions = LazyQuiz(self.question_ids)
+        return self._questions
+
+    @property
+    def total(self):
+        return len(self.question_ids)
+
+    @property
+    def finished(self):
+        return self.position >= self.total
+
+    def current_question(self):
+        """The question to answer next, or None once the quiz is over"""
+        if self.finished:
+            return None
+        return self.questions[self.position]
+
+    def submit_answer(self, answer):
+        """Record an answer to the current question and move on.
+
+        Returns (is_correct, correct_answer). Raises ValueError for an empty
+        answer or when the quiz is already finished.
+        """
+        if self.finished:
+            raise ValueError("The quiz is already finished")
+        if not answer:
+            raise ValueError("Please select an answer")
+
+        question = self.current_question()
+        is_correct = question.check_answer(answer)
+        if is_correct:
+            self.score += 1
+        self.responses.append(question.options.index(answer)
+                              if answer in question.options else NO_OPTION)
+        self.position += 1
+        return is_correct, question.correct_answer
+
+    def results(self):
+        """Final score summary"""
+        percentage = (self.score / self.total) * 100 if self.total else 0.0
+        return {
+            "score": self.score,
+            "total": self.total,
+            "percentage": percentage,
+            "feedback": feedback_for(percentage)
+        }
+
+    def to_state(self):
+        """Plain-value snapshot of the session"""
+        return {
+            "session_id": self.session_id,
+            "course": self.course,
+            "question_ids": self.question_ids,
+            "position": self.position,
+            "score": self.score,
+            "responses": self.responses
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a session from to_state() output"""
+        if state.get("adaptive") and cls is QuizSession:
+            return AdaptiveQuizSession.from_state(state)
+        return cls(state["course"], state["question_ids"], session_id=state["session_id"],
+                   position=state["position"], score=state["score"],
+                   responses=state["responses"])
+
+    def to_json(self):
+        return json.dumps(self.to_state(), separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, data):
+        return cls.from_state(json.loads(data))
+
+
+def estimate_ability(difficulties, outcomes, start=0.0):
+    """Maximum a posteriori ability under the Rasch model with a N(0, 1) prior.
+
+    difficulties and outcomes (1 right, 0 wrong) are the answered questions.
+    The prior keeps the estimate finite when every answer is right or wrong.
+    """
+    ability = start
+    for _ in range(NEWTON_STEPS):
+        slope = -ability
+        curvature = -1.0
+        for difficulty, outcome in zip(difficulties, outcomes):
+            p = 1.0 / (1.0 + math.exp(difficulty - ability))
+            slope += outcome - p
+            curvature -= p * (1.0 - p)
+        step = slope / curvature
+        ability -= step
+        if abs(step) < 1e-6:
+            break
+    return ability
+
+
+class AdaptiveQuizSession(QuizSession):
+    """A quiz that serves the unseen question nearest the taker's ability"""
+
+    def __init__(self, course, length=ADAPTIVE_LENGTH, question_ids=(), session_id=None,
+                 position=0, score=0, responses=None, difficulties=None, outcomes=None,
+                 ability=0.0):
+        super().__init__(course, question_ids, session_id=session_id, position=position,
+                         score=score, responses=responses)
+        self.length = length
+        self.difficulties = list(difficulties) if difficulties is not None else []
+        self.outcomes = list(outcomes) if outcomes is not None else []
+        self.ability = ability
+        self._current = None
+        self._id_range = None
+
+    @classmethod
+    def start(cls, course, count=None, stratified=False):
+        """Begin an adaptive quiz of count questions (ADAPTIVE_LENGTH by default)"""
+        return cls(course, count or ADAPTIVE_LENGTH)
+
+    @property
+    def total(self):
+        return self.length
+
+    def current_question(self):
+        """Pick (once) and return the question to answer next, or None when over"""
+        if self.finished:
+            return None
+        if self.position == len(self.question_ids):
+            if self._id_range is None:
+                self._id_range = quiz_db.question_id_range(self.course)
+            low, high = self._id_range
+            start_id = random.randint(low, high) if low is not None else 0
+            picked = quiz_db.nearest_question(self.course, self.ability, self.question_ids,
+                                              start_id=start_id)
+            if picked is None:
+                # Fewer questions in the course than the quiz length
+                self.length = self.position
+                return None
+            self.question_ids.append(picked[0])
+            self.difficulties.append(picked[1])
+
+        question_id = self.question_ids[self.position]
+        if self._current is None or self._current.question_id != question_id:
+            row = quiz_db.get_questions_by_ids([question_id]).get(question_id)
+            if row is None:
+                raise LookupError(f"Question {question_id} no longer exists")
+            self._current = Question(row[0], row[1], list(row[2:6]), row[6])
+        return self._current
+
+    def submit_answer(self, answer):
+        """Record an answer, then update the ability estimate"""
+        if self.current_question() is None:
+            raise ValueError("The quiz is already finished")
+        is_correct, correct_answer = super().submit_answer(answer)
+        self.outcomes.append(int(is_correct))
+        self.ability = estimate_ability(self.difficulties, self.outcomes, self.ability)
+        return is_correct, correct_answer
+
+    def results(self):
+        results = super().results()
+        results["ability"] = self.ability
+        return results
+
+    def to_state(self):
+        state = super().to_state()
+        state.update(adaptive=True, length=self.length, difficulties=self.difficulties,
+                     outcomes=self.outcomes, ability=self.ability)
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        return cls(state["course"], state["length"], state["question_ids"],
+                   session_id=state["session_id"], position=state["position"],
+                   score=state["score"], responses=state["responses"],
+                   difficulties=state["difficulties"], outcomes=state["outcomes"],
+                   ability=state["ability"])
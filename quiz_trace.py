@@ -0,0 +1,378 @@
+"""Opt-in timing spans for database calls, screen changes and dialogs.
+
+Nothing here runs unless tracing is switched on. enable() swaps quiz_db's
+public functions (and, if given, a GUI class's show_* methods and the
+tkinter message boxes) for timing wrappers and asks the connection pool to
+report the SQL it runs; disable() puts the originals back. So with tracing
+off there are no wrappers at all, and the only cost left is one global
+check when a pooled connection is borrowed.
+
+Each span records its kind ("db", "screen" or "dialog"), name, duration,
+thread and attributes: the course argument, the rows returned, rows
+changed, and the first few SQL statements. Finished spans feed a
+fixed-bucket histogram per (kind, name) and a rolling window of the most
+recent RECENT_SPANS spans, so memory stays bounded however long the app
+runs. to_json() and to_prometheus() export both, along with the counters
+of anything registered with register_counters() (such as the question
+cache's hits and misses).
+
+The GUI turns tracing on when QUIZ_TRACE names an output file:
+
+    QUIZ_TRACE=trace.json python "quaterly assessment 2.py"   # or trace.prom
+"""
+import bisect
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import quiz_db
+
+# Upper bounds in seconds; one more bucket catches everything slower
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+RECENT_SPANS = 1000
+MAX_STATEMENTS = 5      # SQL statements kept per span
+MAX_SQL_LENGTH = 200
+
+# quiz_db functions that are timed; pure helpers like validate_question are left alone
+DB_OPERATIONS = (
+    "initialize_database", "migrate_legacy_tables", "seed_sample_questions", "schema_version",
+    "list_courses", "add_course", "add_question", "add_questions", "get_question",
+    "update_question", "delete_question", "fetch_question_page", "search_questions",
+    "list_questions", "load_questions", "get_answer_key", "question_id_range",
+    "list_question_ids", "seek_question_ids", "random_question_ids", "get_questions_by_ids",
+    "record_attempts", "item_statistics", "score_distribution", "nearest_question",
+    "set_question_bands", "unindexed_questions", "band_matches", "delete_questions",
+    "move_questions", "replace_in_options", "iter_questions", "band_buckets"
+)
+DIALOGS = ("showinfo", "showwarning", "showerror", "askyesno")
+ENV_VAR = "QUIZ_TRACE"
+
+
+class Histogram:
+    """Counts of durations per bucket, plus their total"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, fraction):
+        """Upper bound of the bucket holding the given quantile; None past the last bound"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+
+class Span:
+    """One timed operation; attributes can be added while it runs"""
+
+    __slots__ = ("kind", "name", "attrs", "statements", "start", "seconds", "thread")
+
+    def __init__(self, kind, name, attrs):
+        self.kind = kind
+        self.name = name
+        self.attrs = attrs
+        self.statements = 0
+        self.start = time.time()
+        self.seconds = None
+        self.thread = threading.current_thread().name
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def to_dict(self):
+        return {"kind": self.kind, "name": self.name, "start": self.start,
+                "ms": self.seconds * 1000, "thread": self.thread,
+                "statements": self.statements, **self.attrs}
+
+
+class Tracer:
+    """Collects finished spans; also receives SQL from the connection pool"""
+
+    def __init__(self, recent=RECENT_SPANS):
+        self.histograms = {}
+        self.recent = deque(maxlen=recent)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def begin(self, kind, name, **attrs):
+        span = Span(kind, name, attrs)
+        self._stack().append((span, time.perf_counter()))
+        return span
+
+    def end(self):
+        span, started = self._stack().pop()
+        span.seconds = time.perf_counter() - started
+        self.finish(span)
+        return span
+
+    def finish(self, span):
+        """Add a span whose seconds are set to the histograms"""
+        with self._lock:
+            histogram = self.histograms.get((span.kind, span.name))
+            if histogram is None:
+                histogram = self.histograms[(span.kind, span.name)] = Histogram()
+            histogram.add(span.seconds)
+            self.recent.append(span)
+
+    def current(self):
+        stack = self._stack()
+        return stack[-1][0] if stack else None
+
+    # Called by quiz_db's pool on the thread running the SQL
+
+    def statement(self, sql):
+        span = self.current()
+        if span is None:
+            return
+        span.statements += 1
+        if span.statements <= MAX_STATEMENTS:
+            span.attrs.setdefault("sql", []).append(" ".join(sql.split())[:MAX_SQL_LENGTH])
+
+    def changes(self, count):
+        span = self.current()
+        if span is not None and count:
+            span.attrs["changed"] = span.attrs.get("changed", 0) + count
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.recent.clear()
+
+
+_tracer = None
+_patched = []   # (owner, attribute, original) to undo in disable()
+_counters = {}  # name -> function returning a dict of numbers
+
+
+def enabled():
+    return _tracer is not None
+
+
+def tracer():
+    """The active Tracer, or None while tracing is off"""
+    return _tracer
+
+
+def _row_count(result):
+    if isinstance(result, (list, dict)):
+        return len(result)
+    if result is None:
+        return 0
+    if isinstance(result, tuple):
+        return 1
+    return None
+
+
+def _set_course(span, course_arg, args, kwargs):
+    if course_arg is not None:
+        course = kwargs.get("course", args[course_arg] if len(args) > course_arg else None)
+        if course is not None:
+            span.attrs["course"] = course
+
+
+def _wrap(kind, name, fn, course_arg=None):
+    """Time fn as a span; course_arg is the position of its course parameter"""
+    @functools.wraps(fn)
+    def traced(*args, **kwargs):
+        active = _tracer
+        if active is None:
+            return fn(*args, **kwargs)
+        span = active.begin(kind, name)
+        _set_course(span, course_arg, args, kwargs)
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            span.attrs["error"] = repr(e)
+            raise
+        finally:
+            active.end()
+        rows = _row_count(result)
+        if rows is not None:
+            span.attrs["rows"] = rows
+        return result
+    return traced
+
+
+def _wrap_generator(kind, name, fn, course_arg=None):
+    """Like _wrap for a generator: one span from the call until iteration stops.
+
+    The span is only the current one while the generator runs, so SQL
+    issued by the caller between rows is not counted against it.
+    """
+    @functools.wraps(fn)
+    def traced(*args, **kwargs):
+        active = _tracer
+        if active is None:
+            yield from fn(*args, **kwargs)
+            return
+        span = Span(kind, name, {})
+        _set_course(span, course_arg, args, kwargs)
+        started = time.perf_counter()
+        rows = fn(*args, **kwargs)
+        count = 0
+        try:
+            while True:
+                stack = active._stack()
+                stack.append((span, started))
+                try:
+                    row = next(rows)
+                except StopIteration:
+                    break
+                finally:
+                    stack.pop()
+                count += 1
+                yield row
+        except Exception as e:
+            span.attrs["error"] = repr(e)
+            raise
+        finally:
+            rows.close()
+            span.attrs["rows"] = count
+            span.seconds = time.perf_counter() - started
+            active.finish(span)
+    return traced
+
+
+def _course_position(fn):
+    parameters = list(inspect.signature(fn).parameters)
+    return parameters.index("course") if "course" in parameters else None
+
+
+def _patch(owner, attribute, wrapper):
+    _patched.append((owner, attribute, owner.__dict__[attribute]))
+    setattr(owner, attribute, wrapper)
+
+
+def enable(screens=None, dialogs=True):
+    """Start tracing quiz_db calls, and show_* methods of the screens class.
+
+    With screens given, tkinter's message boxes are timed too (dialogs=False
+    skips them). Returns the Tracer. Calling it again keeps the same one.
+    """
+    global _tracer
+    if _tracer is not None:
+        return _tracer
+    _tracer = Tracer()
+
+    for name in DB_OPERATIONS:
+        fn = getattr(quiz_db, name)
+        wrap = _wrap_generator if inspect.isgeneratorfunction(fn) else _wrap
+        _patch(quiz_db, name, wrap("db", name, fn, _course_position(fn)))
+    quiz_db.set_tracer(_tracer)
+
+    if screens is not None:
+        for name, method in list(vars(screens).items()):
+            if name.startswith("show_") and callable(method):
+                _patch(screens, name, _wrap("screen", name, method, _course_position(method)))
+        if dialogs:
+            from tkinter import messagebox
+            for name in DIALOGS:
+                _patch(messagebox, name, _wrap("dialog", name, getattr(messagebox, name)))
+    return _tracer
+
+
+def disable():
+    """Stop tracing and restore every patched function; returns the last Tracer"""
+    global _tracer
+    finished = _tracer
+    quiz_db.set_tracer(None)
+    while _patched:
+        owner, attribute, original = _patched.pop()
+        setattr(owner, attribute, original)
+    _tracer = None
+    return finished
+
+
+def register_counters(name, fn):
+    """Export fn()'s dict of numbers with every trace, under name"""
+    _counters[name] = fn
+
+
+def _counter_values():
+    return {name: fn() for name, fn in sorted(_counters.items())}
+
+
+def _labels(kind, name):
+    return f'kind="{kind}",name="{name}"'
+
+
+def _ms(seconds):
+    return None if seconds is None else seconds * 1000
+
+
+def to_json(active=None):
+    """Histograms, recent spans and registered counters as a JSON-ready dict"""
+    active = active or _tracer
+    if active is None:
+        return {"histograms": [], "spans": [], "counters": _counter_values()}
+    with active._lock:
+        histograms = [{
+            "kind": kind, "name": name, "count": h.count, "total_ms": h.total * 1000,
+            "mean_ms": h.total / h.count * 1000 if h.count else 0.0,
+            "p50_ms": _ms(h.quantile(0.5)), "p99_ms": _ms(h.quantile(0.99)),
+            "buckets": dict(zip([str(b) for b in BUCKETS] + ["+Inf"], h.counts))
+        } for (kind, name), h in sorted(active.histograms.items())]
+        spans = [span.to_dict() for span in active.recent]
+    return {"histograms": histograms, "spans": spans, "counters": _counter_values()}
+
+
+def to_prometheus(active=None):
+    """Histograms and registered counters in the Prometheus text exposition format"""
+    active = active or _tracer
+    lines = ["# HELP quiz_span_seconds Time spent in traced quiz app operations",
+             "# TYPE quiz_span_seconds histogram"]
+    if active is not None:
+        with active._lock:
+            for (kind, name), h in sorted(active.histograms.items()):
+                labels = _labels(kind, name)
+                cumulative = 0
+                for bound, count in zip(BUCKETS, h.counts):
+                    cumulative += count
+                    lines.append(f'quiz_span_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'quiz_span_seconds_bucket{{{labels},le="+Inf"}} {h.count}')
+                lines.append(f"quiz_span_seconds_sum{{{labels}}} {h.total:.6f}")
+                lines.append(f"quiz_span_seconds_count{{{labels}}} {h.count}")
+    for name, values in _counter_values().items():
+        for key, value in values.items():
+            lines.append(f"quiz_{name}_{key} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def dump(path, active=None):
+    """Write to_prometheus() for a .prom/.txt path, otherwise to_json()"""
+    with open(path, "w", encoding="utf-8") as f:
+        if path.endswith((".prom", ".txt")):
+            f.write(to_prometheus(active))
+        else:
+            json.dump(to_json(active), f, indent=2)
+
+
+def enable_from_env(screens=None):
+    """Enable tracing if QUIZ_TRACE is set; returns the dump path or None"""
+    path = os.environ.get(ENV_VAR)
+    if not path:
+        return None
+    enable(screens)
+    return path